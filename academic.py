@@ -1,6 +1,7 @@
 from flask import Blueprint, request, jsonify
 from datetime import datetime, date
 from sqlalchemy import or_, and_
+from sqlalchemy.orm import joinedload, undefer_group
 
 from src.models.user import db, School, AcademicYear, Class, Subject, Enrollment, Student, Teacher
 from src.models.assessment import Assignment, Grade, ReportCard
@@ -15,9 +16,10 @@ academic_bp = Blueprint('academic', __name__)
 def get_schools():
     """Get list of schools"""
     try:
-        schools = School.query.filter_by(is_active=True).all()
+        # bulk_to_dict pulls exactly the serialized columns (deferred
+        # JSON blobs included) in one SELECT
         return jsonify({
-            'schools': [school.to_dict() for school in schools]
+            'schools': School.bulk_to_dict(School.query.filter_by(is_active=True))
         }), 200
     except Exception as e:
         return jsonify({'error': str(e)}), 500
@@ -43,7 +45,7 @@ def create_school():
         )
         
         if data.get('configuration'):
-            school.set_configuration(data['configuration'])
+            school.configuration = data['configuration']
         
         db.session.add(school)
         db.session.commit()
@@ -68,11 +70,11 @@ def get_academic_years():
         query = AcademicYear.query
         if school_id:
             query = query.filter_by(school_id=school_id)
-        
-        academic_years = query.order_by(AcademicYear.start_date.desc()).all()
-        
+
         return jsonify({
-            'academic_years': [year.to_dict() for year in academic_years]
+            'academic_years': AcademicYear.bulk_to_dict(
+                query.order_by(AcademicYear.start_date.desc())
+            )
         }), 200
         
     except Exception as e:
@@ -106,10 +108,10 @@ def create_academic_year():
         )
         
         if data.get('term_structure'):
-            academic_year.set_term_structure(data['term_structure'])
+            academic_year.term_structure = data['term_structure']
         
         if data.get('holiday_calendar'):
-            academic_year.set_holiday_calendar(data['holiday_calendar'])
+            academic_year.holiday_calendar = data['holiday_calendar']
         
         db.session.add(academic_year)
         db.session.commit()
@@ -135,7 +137,8 @@ def get_classes():
         teacher_id = request.args.get('teacher_id', type=int)
         grade_level = request.args.get('grade_level')
         
-        query = Class.query.filter_by(is_active=True)
+        query = Class.query.filter_by(is_active=True)\
+            .options(undefer_group('blob'))
         
         if school_id:
             query = query.filter_by(school_id=school_id)
@@ -205,7 +208,7 @@ def create_class():
         )
         
         if data.get('schedule'):
-            class_obj.set_schedule(data['schedule'])
+            class_obj.schedule = data['schedule']
         
         db.session.add(class_obj)
         db.session.commit()
@@ -247,7 +250,7 @@ def update_class(class_id):
         if 'classroom' in data:
             class_obj.classroom = data['classroom']
         if 'schedule' in data:
-            class_obj.set_schedule(data['schedule'])
+            class_obj.schedule = data['schedule']
         if 'is_active' in data:
             class_obj.is_active = data['is_active']
         
@@ -287,7 +290,10 @@ def get_class_students(class_id):
         # Get enrolled students
         enrollments = Enrollment.query.filter_by(
             class_id=class_id, status='Active'
-        ).join(Student).join(Student.user).all()
+        ).join(Student).join(Student.user).options(
+            undefer_group('blob'),
+            joinedload(Enrollment.student).undefer_group('blob')
+        ).all()
         
         result = []
         for enrollment in enrollments:
@@ -312,11 +318,9 @@ def get_subjects():
         query = Subject.query.filter_by(is_active=True)
         if school_id:
             query = query.filter_by(school_id=school_id)
-        
-        subjects = query.all()
-        
+
         return jsonify({
-            'subjects': [subject.to_dict() for subject in subjects]
+            'subjects': Subject.bulk_to_dict(query)
         }), 200
         
     except Exception as e:
@@ -344,10 +348,10 @@ def create_subject():
         )
         
         if data.get('prerequisites'):
-            subject.set_prerequisites(data['prerequisites'])
+            subject.prerequisites = data['prerequisites']
         
         if data.get('learning_objectives'):
-            subject.set_learning_objectives(data['learning_objectives'])
+            subject.learning_objectives = data['learning_objectives']
         
         db.session.add(subject)
         db.session.commit()
@@ -374,8 +378,13 @@ def get_enrollments():
         year_id = request.args.get('year_id', type=int)
         status = request.args.get('status')
         
-        query = Enrollment.query
-        
+        query = Enrollment.query.options(
+            undefer_group('blob'),
+            joinedload(Enrollment.student).undefer_group('blob'),
+            joinedload(Enrollment.enrolled_class).undefer_group('blob'),
+            joinedload(Enrollment.academic_year).undefer_group('blob')
+        )
+
         if student_id:
             query = query.filter_by(student_id=student_id)
         
@@ -476,7 +485,7 @@ def update_enrollment(enrollment_id):
             enrollment.completion_date = datetime.strptime(data['completion_date'], '%Y-%m-%d').date()
         
         if 'performance_summary' in data:
-            enrollment.set_performance_summary(data['performance_summary'])
+            enrollment.performance_summary = data['performance_summary']
         
         db.session.commit()
         
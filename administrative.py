@@ -254,10 +254,11 @@ def get_book_transactions():
         
         # Apply role-based filtering
         if current_user_role == 'student':
-            student = Student.query.filter_by(user_id=current_user_id).first()
-            if not student:
+            own_student_id = db.session.query(Student.student_id)\
+                .filter_by(user_id=current_user_id).scalar()
+            if not own_student_id:
                 return jsonify({'error': 'Student profile not found'}), 404
-            query = query.filter_by(student_id=student.student_id)
+            query = query.filter_by(student_id=own_student_id)
         elif current_user_role not in ['admin', 'staff']:
             return jsonify({'error': 'Access denied'}), 403
         
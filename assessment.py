@@ -1,10 +1,15 @@
 from flask_sqlalchemy import SQLAlchemy
 from sqlalchemy import Numeric
-from datetime import datetime, date
-import json
+from datetime import datetime, date, time
 
-# Import db from user models
-from src.models.user import db
+# Import db and the JSON column type from user models
+from src.models.user import db, JSONDocument
+
+# Unbound isoformat methods hoisted once so to_dict bodies skip the
+# per-call bound-method creation (same pattern as the user models)
+_date_iso = date.isoformat
+_dt_iso = datetime.isoformat
+_time_iso = time.isoformat
 
 # Assessment and Grading Models
 class Assignment(db.Model):
@@ -20,19 +25,21 @@ class Assignment(db.Model):
     max_points = db.Column(Numeric(5, 2))
     weight_factor = db.Column(Numeric(3, 2), default=1.0)
     assignment_type = db.Column(db.String(50))  # Homework, Quiz, Exam, Project, etc.
-    grading_criteria = db.Column(db.Text)  # JSON string
+    grading_criteria = db.Column(JSONDocument)
     is_published = db.Column(db.Boolean, default=False)
     created_at = db.Column(db.DateTime, default=datetime.utcnow)
-    
+
+    # Matches the "recent assignments per teacher" ordering used by the API
+    __table_args__ = (
+        db.Index('ix_assign_teacher_created', teacher_id, created_at.desc()),
+    )
+
     # Relationships
-    submissions = db.relationship('Submission', backref='assignment', lazy=True)
-    grades = db.relationship('Grade', backref='assignment', lazy=True)
-    
-    def get_grading_criteria(self):
-        return json.loads(self.grading_criteria) if self.grading_criteria else {}
-    
-    def set_grading_criteria(self, criteria):
-        self.grading_criteria = json.dumps(criteria)
+    assigned_class = db.relationship('Class', back_populates='assignments', lazy='select')
+    subject = db.relationship('Subject', back_populates='assignments', lazy='select')
+    teacher = db.relationship('Teacher', back_populates='assignments', lazy='select')
+    submissions = db.relationship('Submission', back_populates='assignment', lazy='select')
+    grades = db.relationship('Grade', back_populates='assignment', lazy='select')
     
     def to_dict(self):
         return {
@@ -42,13 +49,13 @@ class Assignment(db.Model):
             'teacher_id': self.teacher_id,
             'title': self.title,
             'description': self.description,
-            'due_date': self.due_date.isoformat() if self.due_date else None,
+            'due_date': _date_iso(self.due_date) if self.due_date else None,
             'max_points': float(self.max_points) if self.max_points else None,
             'weight_factor': float(self.weight_factor) if self.weight_factor else None,
             'assignment_type': self.assignment_type,
-            'grading_criteria': self.get_grading_criteria(),
+            'grading_criteria': self.grading_criteria or {},
             'is_published': self.is_published,
-            'created_at': self.created_at.isoformat() if self.created_at else None
+            'created_at': _dt_iso(self.created_at) if self.created_at else None
         }
 
 class Submission(db.Model):
@@ -58,33 +65,25 @@ class Submission(db.Model):
     assignment_id = db.Column(db.Integer, db.ForeignKey('assignments.assignment_id'), nullable=False)
     student_id = db.Column(db.Integer, db.ForeignKey('students.student_id'), nullable=False)
     submitted_at = db.Column(db.DateTime, default=datetime.utcnow)
-    submission_data = db.Column(db.Text)  # JSON string - file paths, text content, etc.
+    submission_data = db.Column(JSONDocument)  # file paths, text content, etc.
     status = db.Column(db.String(50), default='Submitted')  # Submitted, Graded, Late, etc.
     version_number = db.Column(db.Integer, default=1)
-    feedback = db.Column(db.Text)  # JSON string
-    
-    def get_submission_data(self):
-        return json.loads(self.submission_data) if self.submission_data else {}
-    
-    def set_submission_data(self, data):
-        self.submission_data = json.dumps(data)
-    
-    def get_feedback(self):
-        return json.loads(self.feedback) if self.feedback else {}
-    
-    def set_feedback(self, feedback_data):
-        self.feedback = json.dumps(feedback_data)
-    
+    feedback = db.Column(JSONDocument)
+
+    # Relationships
+    assignment = db.relationship('Assignment', back_populates='submissions', lazy='select')
+    student = db.relationship('Student', back_populates='submissions', lazy='select')
+
     def to_dict(self):
         return {
             'submission_id': self.submission_id,
             'assignment_id': self.assignment_id,
             'student_id': self.student_id,
-            'submitted_at': self.submitted_at.isoformat() if self.submitted_at else None,
-            'submission_data': self.get_submission_data(),
+            'submitted_at': _dt_iso(self.submitted_at) if self.submitted_at else None,
+            'submission_data': self.submission_data or {},
             'status': self.status,
             'version_number': self.version_number,
-            'feedback': self.get_feedback()
+            'feedback': self.feedback or {}
         }
 
 class Grade(db.Model):
@@ -99,7 +98,18 @@ class Grade(db.Model):
     comments = db.Column(db.Text)
     graded_at = db.Column(db.DateTime, default=datetime.utcnow)
     is_final = db.Column(db.Boolean, default=True)
-    
+
+    # Match the per-student and per-teacher grade orderings used by the API
+    __table_args__ = (
+        db.Index('ix_grade_student_graded', student_id, graded_at.desc()),
+        db.Index('ix_grade_teacher_graded', teacher_id, graded_at.desc()),
+    )
+
+    # Relationships
+    assignment = db.relationship('Assignment', back_populates='grades', lazy='select')
+    student = db.relationship('Student', back_populates='grades', lazy='select')
+    teacher = db.relationship('Teacher', back_populates='grades', lazy='select')
+
     def to_dict(self):
         return {
             'grade_id': self.grade_id,
@@ -109,7 +119,7 @@ class Grade(db.Model):
             'points_earned': float(self.points_earned) if self.points_earned else None,
             'letter_grade': self.letter_grade,
             'comments': self.comments,
-            'graded_at': self.graded_at.isoformat() if self.graded_at else None,
+            'graded_at': _dt_iso(self.graded_at) if self.graded_at else None,
             'is_final': self.is_final
         }
 
@@ -120,28 +130,26 @@ class ReportCard(db.Model):
     student_id = db.Column(db.Integer, db.ForeignKey('students.student_id'), nullable=False)
     year_id = db.Column(db.Integer, db.ForeignKey('academic_years.year_id'), nullable=False)
     term = db.Column(db.String(50), nullable=False)
-    grade_summary = db.Column(db.Text)  # JSON string
+    grade_summary = db.Column(JSONDocument)
     teacher_comments = db.Column(db.Text)
     principal_comments = db.Column(db.Text)
     generated_at = db.Column(db.DateTime, default=datetime.utcnow)
     is_published = db.Column(db.Boolean, default=False)
-    
-    def get_grade_summary(self):
-        return json.loads(self.grade_summary) if self.grade_summary else {}
-    
-    def set_grade_summary(self, summary):
-        self.grade_summary = json.dumps(summary)
-    
+
+    # Relationships
+    student = db.relationship('Student', back_populates='report_cards', lazy='select')
+    academic_year = db.relationship('AcademicYear', back_populates='report_cards', lazy='select')
+
     def to_dict(self):
         return {
             'report_id': self.report_id,
             'student_id': self.student_id,
             'year_id': self.year_id,
             'term': self.term,
-            'grade_summary': self.get_grade_summary(),
+            'grade_summary': self.grade_summary or {},
             'teacher_comments': self.teacher_comments,
             'principal_comments': self.principal_comments,
-            'generated_at': self.generated_at.isoformat() if self.generated_at else None,
+            'generated_at': _dt_iso(self.generated_at) if self.generated_at else None,
             'is_published': self.is_published
         }
 
@@ -159,19 +167,34 @@ class AttendanceRecord(db.Model):
     remarks = db.Column(db.Text)
     recorded_by = db.Column(db.Integer, db.ForeignKey('users.user_id'))
     created_at = db.Column(db.DateTime, default=datetime.utcnow)
-    
+
+    # One record per student/class/day; the unique index also backs the
+    # ON CONFLICT upsert used when recording attendance. Declared as a
+    # named index (not a table constraint) so startup can create it
+    # idempotently on databases whose table predates it — db.create_all
+    # never alters existing tables.
+    __table_args__ = (
+        db.Index('uq_attendance_student_class_date',
+                 student_id, class_id, attendance_date, unique=True),
+        db.Index('ix_attendance_student_date', student_id, attendance_date.desc()),
+    )
+
+    # Relationships
+    student = db.relationship('Student', back_populates='attendance_records', lazy='select')
+    attendance_class = db.relationship('Class', back_populates='attendance_records', lazy='select')
+
     def to_dict(self):
         return {
             'attendance_id': self.attendance_id,
             'student_id': self.student_id,
             'class_id': self.class_id,
-            'attendance_date': self.attendance_date.isoformat() if self.attendance_date else None,
+            'attendance_date': _date_iso(self.attendance_date) if self.attendance_date else None,
             'status': self.status,
-            'check_in_time': self.check_in_time.isoformat() if self.check_in_time else None,
-            'check_out_time': self.check_out_time.isoformat() if self.check_out_time else None,
+            'check_in_time': _time_iso(self.check_in_time) if self.check_in_time else None,
+            'check_out_time': _time_iso(self.check_out_time) if self.check_out_time else None,
             'remarks': self.remarks,
             'recorded_by': self.recorded_by,
-            'created_at': self.created_at.isoformat() if self.created_at else None
+            'created_at': _dt_iso(self.created_at) if self.created_at else None
         }
 
 class StaffAttendance(db.Model):
@@ -186,17 +209,20 @@ class StaffAttendance(db.Model):
     status = db.Column(db.String(20), nullable=False)  # Present, Absent, Late, Half Day
     remarks = db.Column(db.Text)
     created_at = db.Column(db.DateTime, default=datetime.utcnow)
-    
+
+    # Relationships
+    staff = db.relationship('Staff', back_populates='staff_attendance', lazy='select')
+
     def to_dict(self):
         return {
             'attendance_id': self.attendance_id,
             'staff_id': self.staff_id,
-            'attendance_date': self.attendance_date.isoformat() if self.attendance_date else None,
-            'check_in_time': self.check_in_time.isoformat() if self.check_in_time else None,
-            'check_out_time': self.check_out_time.isoformat() if self.check_out_time else None,
+            'attendance_date': _date_iso(self.attendance_date) if self.attendance_date else None,
+            'check_in_time': _time_iso(self.check_in_time) if self.check_in_time else None,
+            'check_out_time': _time_iso(self.check_out_time) if self.check_out_time else None,
             'hours_worked': float(self.hours_worked) if self.hours_worked else None,
             'status': self.status,
             'remarks': self.remarks,
-            'created_at': self.created_at.isoformat() if self.created_at else None
+            'created_at': _dt_iso(self.created_at) if self.created_at else None
         }
 
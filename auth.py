@@ -1,9 +1,10 @@
-from flask import Blueprint, request, jsonify
+from flask import Blueprint, request, jsonify, g
 from werkzeug.security import check_password_hash
 import jwt
 from datetime import datetime, timedelta
 from functools import wraps
 import os
+import time
 
 from src.models.user import db, User, Student, Teacher, Parent, Staff
 
@@ -23,6 +24,10 @@ def generate_token(user):
         'exp': datetime.utcnow() + timedelta(hours=JWT_EXPIRATION_HOURS),
         'iat': datetime.utcnow()
     }
+    # Carry the profile id for teachers so ownership checks on teacher
+    # endpoints need no database lookup
+    if user.role_type == 'teacher' and user.teacher_profile:
+        payload['teacher_id'] = user.teacher_profile.teacher_id
     return jwt.encode(payload, JWT_SECRET, algorithm='HS256')
 
 def verify_token(token):
@@ -79,6 +84,88 @@ def role_required(allowed_roles):
         return decorated
     return decorator
 
+def _current_student_id():
+    """Resolve the student_id of the current user, cached per request"""
+    if not hasattr(g, '_current_student_id'):
+        # Select just the id; the full row (with its JSON text columns)
+        # is never needed for the comparison
+        g._current_student_id = db.session.query(Student.student_id).filter_by(
+            user_id=request.current_user['user_id']
+        ).scalar()
+    return g._current_student_id
+
+def student_access_required(staff_roles=('admin', 'teacher', 'staff')):
+    """Decorator to allow the listed staff roles or the student who owns the record
+
+    Expects the wrapped view to take a student_id argument. Student users
+    may only access their own record; other roles must be in staff_roles.
+    """
+    def decorator(f):
+        @wraps(f)
+        def decorated(*args, **kwargs):
+            current_user_role = request.current_user.get('role_type')
+
+            if current_user_role == 'student':
+                if _current_student_id() != kwargs.get('student_id'):
+                    return jsonify({'error': 'Access denied'}), 403
+            elif current_user_role not in staff_roles:
+                return jsonify({'error': 'Access denied'}), 403
+
+            return f(*args, **kwargs)
+        return decorated
+    return decorator
+
+# Short-lived user_id -> teacher_id map so pre-claim tokens cost at most
+# one lookup per user per window; the mapping never changes for a user,
+# the TTL just bounds memory
+TEACHER_ID_CACHE_TTL = 300
+_teacher_id_cache = {}
+
+def _current_teacher_id():
+    """Resolve the teacher_id of the current user, cached per request
+
+    Prefers the teacher_id claim embedded in the token at login; tokens
+    issued before that claim existed fall back to a database lookup
+    memoized in a process-local TTL cache.
+    """
+    if not hasattr(g, '_current_teacher_id'):
+        teacher_id = request.current_user.get('teacher_id')
+        if teacher_id is None:
+            user_id = request.current_user['user_id']
+            cached = _teacher_id_cache.get(user_id)
+            if cached is not None and cached[1] > time.monotonic():
+                teacher_id = cached[0]
+            else:
+                teacher_id = db.session.query(Teacher.teacher_id).filter_by(
+                    user_id=user_id
+                ).scalar()
+                _teacher_id_cache[user_id] = (
+                    teacher_id, time.monotonic() + TEACHER_ID_CACHE_TTL
+                )
+        g._current_teacher_id = teacher_id
+    return g._current_teacher_id
+
+def teacher_access_required(staff_roles=('admin', 'staff')):
+    """Decorator to allow the listed staff roles or the teacher who owns the record
+
+    Expects the wrapped view to take a teacher_id argument. Teacher users
+    may only access their own record; other roles must be in staff_roles.
+    """
+    def decorator(f):
+        @wraps(f)
+        def decorated(*args, **kwargs):
+            current_user_role = request.current_user.get('role_type')
+
+            if current_user_role == 'teacher':
+                if _current_teacher_id() != kwargs.get('teacher_id'):
+                    return jsonify({'error': 'Access denied'}), 403
+            elif current_user_role not in staff_roles:
+                return jsonify({'error': 'Access denied'}), 403
+
+            return f(*args, **kwargs)
+        return decorated
+    return decorator
+
 @auth_bp.route('/login', methods=['POST'])
 def login():
     """User login endpoint"""
@@ -102,6 +189,11 @@ def login():
         if not user.is_active:
             return jsonify({'error': 'Account is deactivated'}), 401
         
+        # Upgrade legacy hashes to the preferred scheme while the
+        # plaintext is available
+        if user.password_needs_rehash():
+            user.set_password(password)
+
         # Update last login
         user.last_login = datetime.utcnow()
         db.session.commit()
@@ -110,16 +202,9 @@ def login():
         token = generate_token(user)
         
         # Get role-specific profile data
-        profile_data = None
-        if user.role_type == 'student' and user.student_profile:
-            profile_data = user.student_profile.to_dict()
-        elif user.role_type == 'teacher' and user.teacher_profile:
-            profile_data = user.teacher_profile.to_dict()
-        elif user.role_type == 'parent' and user.parent_profile:
-            profile_data = user.parent_profile.to_dict()
-        elif user.role_type == 'staff' and user.staff_profile:
-            profile_data = user.staff_profile.to_dict()
-        
+        profile = user.profile
+        profile_data = profile.to_dict() if profile else None
+
         return jsonify({
             'message': 'Login successful',
             'token': token,
@@ -187,9 +272,9 @@ def register():
                 salary=data.get('salary')
             )
             if data.get('qualifications'):
-                profile.set_qualifications(data['qualifications'])
+                profile.qualifications = data['qualifications']
             if data.get('subjects_taught'):
-                profile.set_subjects_taught(data['subjects_taught'])
+                profile.subjects_taught = data['subjects_taught']
             db.session.add(profile)
             
         elif data['role_type'] == 'parent':
@@ -261,16 +346,9 @@ def get_profile():
             return jsonify({'error': 'User not found'}), 404
         
         # Get role-specific profile data
-        profile_data = None
-        if user.role_type == 'student' and user.student_profile:
-            profile_data = user.student_profile.to_dict()
-        elif user.role_type == 'teacher' and user.teacher_profile:
-            profile_data = user.teacher_profile.to_dict()
-        elif user.role_type == 'parent' and user.parent_profile:
-            profile_data = user.parent_profile.to_dict()
-        elif user.role_type == 'staff' and user.staff_profile:
-            profile_data = user.staff_profile.to_dict()
-        
+        profile = user.profile
+        profile_data = profile.to_dict() if profile else None
+
         return jsonify({
             'user': user.to_dict(),
             'profile': profile_data
@@ -136,10 +136,11 @@ def get_invoices():
         
         # Apply role-based filtering
         if current_user_role == 'student':
-            student = Student.query.filter_by(user_id=current_user_id).first()
-            if not student:
+            own_student_id = db.session.query(Student.student_id)\
+                .filter_by(user_id=current_user_id).scalar()
+            if not own_student_id:
                 return jsonify({'error': 'Student profile not found'}), 404
-            query = query.filter_by(student_id=student.student_id)
+            query = query.filter_by(student_id=own_student_id)
         elif current_user_role == 'parent':
             # Parents can see invoices for their children
             # This would require a parent-child relationship table
@@ -243,12 +244,13 @@ def get_invoice(invoice_id):
         
         # Check permissions
         if current_user_role == 'student':
-            student = Student.query.filter_by(user_id=current_user_id).first()
-            if not student or invoice.student_id != student.student_id:
+            own_student_id = db.session.query(Student.student_id)\
+                .filter_by(user_id=current_user_id).scalar()
+            if invoice.student_id != own_student_id:
                 return jsonify({'error': 'Access denied'}), 403
         elif current_user_role not in ['admin', 'staff']:
             return jsonify({'error': 'Access denied'}), 403
-        
+
         invoice_data = invoice.to_dict()
         invoice_data['student'] = invoice.student.to_dict()
         invoice_data['fee_structure'] = invoice.fee_structure.to_dict()
@@ -277,17 +279,18 @@ def get_payments():
         
         # Apply role-based filtering
         if current_user_role == 'student':
-            student = Student.query.filter_by(user_id=current_user_id).first()
-            if not student:
+            own_student_id = db.session.query(Student.student_id)\
+                .filter_by(user_id=current_user_id).scalar()
+            if not own_student_id:
                 return jsonify({'error': 'Student profile not found'}), 404
-            query = query.filter_by(student_id=student.student_id)
+            query = query.filter_by(student_id=own_student_id)
         elif current_user_role not in ['admin', 'staff']:
             return jsonify({'error': 'Access denied'}), 403
-        
+
         # Apply filters
         if student_id and current_user_role in ['admin', 'staff']:
             query = query.filter_by(student_id=student_id)
-        
+
         if invoice_id:
             query = query.filter_by(invoice_id=invoice_id)
         
@@ -331,12 +334,13 @@ def create_payment():
         
         # Check permissions
         if current_user_role == 'student':
-            student = Student.query.filter_by(user_id=current_user_id).first()
-            if not student or invoice.student_id != student.student_id:
+            own_student_id = db.session.query(Student.student_id)\
+                .filter_by(user_id=current_user_id).scalar()
+            if invoice.student_id != own_student_id:
                 return jsonify({'error': 'Access denied'}), 403
         elif current_user_role not in ['admin', 'staff']:
             return jsonify({'error': 'Access denied'}), 403
-        
+
         # Validate payment amount
         amount = Decimal(str(data['amount']))
         if amount <= 0:
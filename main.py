@@ -3,8 +3,9 @@ import sys
 # DON'T CHANGE THIS !!!
 sys.path.insert(0, os.path.dirname(os.path.dirname(__file__)))
 
-from flask import Flask, send_from_directory
+from flask import Flask, g, request, send_from_directory, has_request_context
 from flask_cors import CORS
+from sqlalchemy import event, text
 
 # Import database and models
 from src.models.user import db
@@ -21,9 +22,28 @@ from src.routes.academic import academic_bp
 from src.routes.financial import financial_bp
 from src.routes.administrative import administrative_bp
 
+try:
+    import orjson
+except ImportError:
+    orjson = None
+
 app = Flask(__name__, static_folder=os.path.join(os.path.dirname(__file__), 'static'))
 app.config['SECRET_KEY'] = 'school_management_secret_key_2025'
 
+# Use orjson for request parsing and response serialization when available;
+# this speeds up every request.get_json() and jsonify() call in the app
+if orjson is not None:
+    from flask.json.provider import JSONProvider
+
+    class ORJSONProvider(JSONProvider):
+        def dumps(self, obj, **kwargs):
+            return orjson.dumps(obj, default=str).decode()
+
+        def loads(self, s, **kwargs):
+            return orjson.loads(s)
+
+    app.json = ORJSONProvider(app)
+
 # Enable CORS for all routes
 CORS(app)
 
@@ -39,12 +59,56 @@ app.register_blueprint(administrative_bp, url_prefix='/api/admin')
 # Database configuration
 app.config['SQLALCHEMY_DATABASE_URI'] = f"sqlite:///{os.path.join(os.path.dirname(__file__), 'database', 'app.db')}"
 app.config['SQLALCHEMY_TRACK_MODIFICATIONS'] = False
+app.config['SQLALCHEMY_ENGINE_OPTIONS'] = {
+    'pool_size': 20,
+    'max_overflow': 40,
+    'pool_pre_ping': True,
+    'pool_recycle': 1800
+}
+
+# Optional read replica: when DATABASE_REPLICA_URL is set, plain SELECTs
+# are routed to it (see ReadRoutingSession) so heavy list endpoints stop
+# competing with writers on the primary
+replica_url = os.environ.get('DATABASE_REPLICA_URL')
+if replica_url:
+    app.config['SQLALCHEMY_BINDS'] = {'replica': replica_url}
+
 db.init_app(app)
 
 # Create all database tables
 with app.app_context():
     db.create_all()
 
+    # The attendance upsert needs the unique index to exist, but
+    # db.create_all never alters tables that predate it; this form is
+    # idempotent on both supported dialects. Creation fails only if the
+    # table already holds duplicate rows, which need manual cleanup
+    # before upserts can work at all.
+    db.session.execute(text(
+        'CREATE UNIQUE INDEX IF NOT EXISTS uq_attendance_student_class_date '
+        'ON attendance_records (student_id, class_id, attendance_date)'
+    ))
+    db.session.commit()
+
+    # Count queries per request so N+1 regressions show up in the
+    # X-Query-Count header and the warning log instead of only in profiles
+    @event.listens_for(db.engine, 'before_cursor_execute')
+    def _count_query(conn, cursor, statement, parameters, context, executemany):
+        if has_request_context():
+            g._query_count = getattr(g, '_query_count', 0) + 1
+
+QUERY_COUNT_WARN_THRESHOLD = 5
+
+@app.after_request
+def _report_query_count(response):
+    query_count = getattr(g, '_query_count', 0)
+    response.headers['X-Query-Count'] = str(query_count)
+    if query_count > QUERY_COUNT_WARN_THRESHOLD:
+        app.logger.warning(
+            '%s %s issued %d queries', request.method, request.path, query_count
+        )
+    return response
+
 @app.route('/', defaults={'path': ''})
 @app.route('/<path:path>')
 def serve(path):
@@ -1,20 +1,83 @@
 from flask import Blueprint, request, jsonify
+from concurrent.futures import ProcessPoolExecutor
 from datetime import datetime, date
-from sqlalchemy import or_, and_
+import hashlib
+import os
+import time
 
-from src.models.user import db, User, Student, Enrollment, Class, AcademicYear
+from sqlalchemy import or_, and_, insert, select, union_all
+from sqlalchemy.exc import IntegrityError
+from sqlalchemy.orm import joinedload, undefer_group
+
+from src.models.user import db, hash_password, User, Student, Enrollment, Class, AcademicYear
 from src.models.assessment import Grade, Assignment, AttendanceRecord, ReportCard
 from src.models.financial import Invoice, Payment
-from src.routes.auth import token_required, role_required
+from src.routes.auth import token_required, role_required, student_access_required
 
 student_bp = Blueprint('student', __name__)
 
+# Short-lived cache for the student listing. The result only depends on the
+# query string (search, class_id, academic_status, page, per_page). Mutations
+# clear it in the worker that handled the write; other workers serve entries
+# at most TTL seconds stale.
+STUDENT_LIST_CACHE_TTL = 60  # seconds
+STUDENT_LIST_CACHE_MAX = 256  # entries; search makes the key space unbounded
+_student_list_cache = {}
+
+def _store_student_list_cache(key, payload):
+    """Insert a cache entry, sweeping expired ones once the cap is hit
+
+    search is caller-controlled, so without the cap any token holder
+    could grow the dict without bound.
+    """
+    now = time.monotonic()
+    if len(_student_list_cache) >= STUDENT_LIST_CACHE_MAX:
+        expired = [k for k, (expires_at, _) in _student_list_cache.items()
+                   if expires_at <= now]
+        for k in expired:
+            del _student_list_cache[k]
+        while len(_student_list_cache) >= STUDENT_LIST_CACHE_MAX:
+            # Everything is still fresh; evict the oldest insertion
+            del _student_list_cache[next(iter(_student_list_cache))]
+    _student_list_cache[key] = (now + STUDENT_LIST_CACHE_TTL, payload)
+
+# Password hashing is deliberately slow, so run it on a process pool to keep
+# the request workers free and spread bulk imports across cores.
+_pwd_pool = ProcessPoolExecutor(max_workers=os.cpu_count())
+
+def _hash_password(password):
+    """Hash a password on the process pool with the preferred scheme"""
+    return _pwd_pool.submit(hash_password, password).result()
+
+def _make_etag(last_modified):
+    """Build an ETag from a last-modified timestamp"""
+    if not last_modified:
+        return None
+    return hashlib.sha1(last_modified.isoformat().encode()).hexdigest()
+
+def _conditional_response(response, etag):
+    """Attach an ETag and short private cache lifetime to a response"""
+    response.set_etag(etag)
+    response.cache_control.private = True
+    response.cache_control.max_age = 60
+    return response
+
+def _invalidate_student_list_cache():
+    """Clear all cached student listing responses"""
+    _student_list_cache.clear()
+
 @student_bp.route('/', methods=['GET'])
 @token_required
 @role_required(['admin', 'teacher', 'staff'])
 def get_students():
     """Get list of students with filtering and pagination"""
     try:
+        # Serve cached response bytes if a fresh entry exists for this query
+        cache_key = request.query_string.decode()
+        cached = _student_list_cache.get(cache_key)
+        if cached and cached[0] > time.monotonic():
+            return cached[1], 200, {'Content-Type': 'application/json'}
+
         # Get query parameters
         page = request.args.get('page', 1, type=int)
         per_page = min(request.args.get('per_page', 20, type=int), 100)
@@ -22,16 +85,26 @@ def get_students():
         class_id = request.args.get('class_id', type=int)
         academic_status = request.args.get('academic_status', '')
         
-        # Build query
+        # Build query; the listing serializes the lite view, so the
+        # deferred JSON blob columns are never loaded
         query = Student.query.join(User)
         
         # Apply filters
         if search:
-            query = query.filter(or_(
-                User.username.contains(search),
-                User.email.contains(search),
-                Student.admission_number.contains(search)
-            ))
+            # A single OR across columns of two tables defeats the planner;
+            # three UNION'd id sub-selects let each branch use its own index
+            pattern = f'%{search}%'
+            matched_ids = union_all(
+                select(Student.student_id)
+                    .join(User, Student.user_id == User.user_id)
+                    .where(User.username.ilike(pattern)),
+                select(Student.student_id)
+                    .join(User, Student.user_id == User.user_id)
+                    .where(User.email.ilike(pattern)),
+                select(Student.student_id)
+                    .where(Student.admission_number.ilike(pattern))
+            )
+            query = query.filter(Student.student_id.in_(matched_ids))
         
         if class_id:
             query = query.join(Enrollment).filter(
@@ -50,7 +123,7 @@ def get_students():
         result = {
             'students': [
                 {
-                    **student.to_dict(),
+                    **student.to_dict(view='lite'),
                     'user': student.user.to_dict()
                 } for student in students.items
             ],
@@ -64,32 +137,28 @@ def get_students():
             }
         }
         
-        return jsonify(result), 200
-        
+        response = jsonify(result)
+        _store_student_list_cache(cache_key, response.get_data())
+        return response, 200
+
     except Exception as e:
         return jsonify({'error': str(e)}), 500
 
 @student_bp.route('/<int:student_id>', methods=['GET'])
 @token_required
+@student_access_required()
 def get_student(student_id):
     """Get specific student details"""
     try:
-        # Check permissions
-        current_user_role = request.current_user.get('role_type')
-        current_user_id = request.current_user.get('user_id')
-        
-        # Students can only view their own profile
-        if current_user_role == 'student':
-            student = Student.query.filter_by(user_id=current_user_id).first()
-            if not student or student.student_id != student_id:
-                return jsonify({'error': 'Access denied'}), 403
-        elif current_user_role not in ['admin', 'teacher', 'staff']:
-            return jsonify({'error': 'Access denied'}), 403
-        
+        # No ETag here: the payload spans student columns, enrollment,
+        # grades and attendance, none of which touch users.updated_at, so
+        # any cheap fingerprint would keep answering 304 after grade or
+        # attendance writes. Report cards keep theirs, where
+        # max(generated_at) genuinely covers the payload.
         student = Student.query.get(student_id)
         if not student:
             return jsonify({'error': 'Student not found'}), 404
-        
+
         # Get additional information
         current_enrollment = Enrollment.query.filter_by(
             student_id=student_id, status='Active'
@@ -111,9 +180,9 @@ def get_student(student_id):
             'recent_grades': [grade.to_dict() for grade in recent_grades],
             'attendance_summary': {status: count for status, count in attendance_summary}
         }
-        
+
         return jsonify(result), 200
-        
+
     except Exception as e:
         return jsonify({'error': str(e)}), 500
 
@@ -145,8 +214,8 @@ def create_student():
             email=data['email'],
             role_type='student'
         )
-        user.set_password(data['password'])
-        
+        user.password_hash = _hash_password(data['password'])
+
         db.session.add(user)
         db.session.flush()  # Get user ID
         
@@ -162,13 +231,15 @@ def create_student():
         
         # Set emergency contacts and medical information
         if data.get('emergency_contacts'):
-            student.set_emergency_contacts(data['emergency_contacts'])
+            student.emergency_contacts = data['emergency_contacts']
         if data.get('medical_information'):
-            student.set_medical_information(data['medical_information'])
+            student.medical_information = data['medical_information']
         
         db.session.add(student)
         db.session.commit()
-        
+
+        _invalidate_student_list_cache()
+
         return jsonify({
             'message': 'Student created successfully',
             'student': student.to_dict(),
@@ -179,23 +250,100 @@ def create_student():
         db.session.rollback()
         return jsonify({'error': str(e)}), 500
 
+@student_bp.route('/bulk', methods=['POST'])
+@token_required
+@role_required(['admin', 'staff'])
+def create_students_bulk():
+    """Create multiple students in one batch"""
+    try:
+        data = request.get_json()
+
+        if not isinstance(data, list) or not data:
+            return jsonify({'error': 'A non-empty JSON array of students is required'}), 400
+
+        # Validate required fields
+        required_fields = ['username', 'email', 'password']
+        for index, row in enumerate(data):
+            for field in required_fields:
+                if not row.get(field):
+                    return jsonify({'error': f'{field} is required (record {index})'}), 400
+
+        # Duplicates inside one payload would pass the existing-user check
+        # below and only surface as an IntegrityError at insert time
+        usernames = [row['username'] for row in data]
+        emails = [row['email'] for row in data]
+        if len(set(usernames)) != len(usernames) or len(set(emails)) != len(emails):
+            return jsonify({'error': 'Duplicate username or email in batch'}), 409
+
+        # Check for existing users in a single query
+        existing_user = User.query.filter(
+            User.username.in_(usernames) | User.email.in_(emails)
+        ).first()
+
+        if existing_user:
+            return jsonify({'error': 'User already exists'}), 409
+
+        # Pre-hash passwords in parallel across cores, then insert all users
+        # in one statement. Core inserts with RETURNING avoid the per-record
+        # flush of the add/flush/add/commit pattern used for single creates.
+        password_hashes = list(_pwd_pool.map(
+            hash_password, [row['password'] for row in data], chunksize=32
+        ))
+        user_rows = [
+            {
+                'username': row['username'],
+                'email': row['email'],
+                'password_hash': password_hash,
+                'role_type': 'student'
+            } for row, password_hash in zip(data, password_hashes)
+        ]
+
+        # sort_by_parameter_order: insertmanyvalues leaves RETURNING order
+        # undefined otherwise, and the ids are zipped back against data
+        user_ids = db.session.execute(
+            insert(User).returning(
+                User.user_id, sort_by_parameter_order=True
+            ), user_rows
+        ).scalars().all()
+
+        # Insert the student profiles in a second batched statement
+        student_rows = [
+            {
+                'user_id': user_id,
+                'admission_number': row.get('admission_number', f'STU{user_id:06d}'),
+                'date_of_birth': datetime.strptime(row['date_of_birth'], '%Y-%m-%d').date() if row.get('date_of_birth') else None,
+                'gender': row.get('gender'),
+                'address': row.get('address'),
+                'academic_status': row.get('academic_status', 'Active')
+            } for user_id, row in zip(user_ids, data)
+        ]
+
+        db.session.execute(insert(Student), student_rows)
+        db.session.commit()
+
+        _invalidate_student_list_cache()
+
+        return jsonify({
+            'message': f'{len(student_rows)} students created successfully',
+            'user_ids': user_ids
+        }), 201
+
+    except IntegrityError:
+        # Concurrent creates can still slip past the pre-check
+        db.session.rollback()
+        return jsonify({'error': 'User already exists'}), 409
+    except Exception as e:
+        db.session.rollback()
+        return jsonify({'error': str(e)}), 500
+
 @student_bp.route('/<int:student_id>', methods=['PUT'])
 @token_required
+@student_access_required(staff_roles=('admin', 'staff'))
 def update_student(student_id):
     """Update student information"""
     try:
-        # Check permissions
         current_user_role = request.current_user.get('role_type')
-        current_user_id = request.current_user.get('user_id')
-        
-        # Students can only update their own profile (limited fields)
-        if current_user_role == 'student':
-            student = Student.query.filter_by(user_id=current_user_id).first()
-            if not student or student.student_id != student_id:
-                return jsonify({'error': 'Access denied'}), 403
-        elif current_user_role not in ['admin', 'staff']:
-            return jsonify({'error': 'Access denied'}), 403
-        
+
         student = Student.query.get(student_id)
         if not student:
             return jsonify({'error': 'Student not found'}), 404
@@ -216,22 +364,24 @@ def update_student(student_id):
             if 'academic_status' in data:
                 student.academic_status = data['academic_status']
             if 'emergency_contacts' in data:
-                student.set_emergency_contacts(data['emergency_contacts'])
+                student.emergency_contacts = data['emergency_contacts']
             if 'medical_information' in data:
-                student.set_medical_information(data['medical_information'])
+                student.medical_information = data['medical_information']
         else:
             # Students can only update limited fields
             if 'address' in data:
                 student.address = data['address']
             if 'emergency_contacts' in data:
-                student.set_emergency_contacts(data['emergency_contacts'])
+                student.emergency_contacts = data['emergency_contacts']
         
         # Update user information if provided
         if 'email' in data and current_user_role in ['admin', 'staff']:
             student.user.email = data['email']
         
         db.session.commit()
-        
+
+        _invalidate_student_list_cache()
+
         return jsonify({
             'message': 'Student updated successfully',
             'student': student.to_dict()
@@ -243,22 +393,19 @@ def update_student(student_id):
 
 @student_bp.route('/<int:student_id>/enrollments', methods=['GET'])
 @token_required
+@student_access_required()
 def get_student_enrollments(student_id):
     """Get student enrollment history"""
     try:
-        # Check permissions
-        current_user_role = request.current_user.get('role_type')
-        current_user_id = request.current_user.get('user_id')
-        
-        if current_user_role == 'student':
-            student = Student.query.filter_by(user_id=current_user_id).first()
-            if not student or student.student_id != student_id:
-                return jsonify({'error': 'Access denied'}), 403
-        elif current_user_role not in ['admin', 'teacher', 'staff']:
-            return jsonify({'error': 'Access denied'}), 403
-        
+        # Full dicts are serialized per row, so load the deferred JSON
+        # blobs with the rows instead of one lazy SELECT per relationship
         enrollments = Enrollment.query.filter_by(student_id=student_id)\
             .join(Class).join(AcademicYear)\
+            .options(
+                undefer_group('blob'),
+                joinedload(Enrollment.enrolled_class).undefer_group('blob'),
+                joinedload(Enrollment.academic_year).undefer_group('blob')
+            )\
             .order_by(AcademicYear.start_date.desc()).all()
         
         result = []
@@ -275,20 +422,10 @@ def get_student_enrollments(student_id):
 
 @student_bp.route('/<int:student_id>/grades', methods=['GET'])
 @token_required
+@student_access_required()
 def get_student_grades(student_id):
     """Get student grades"""
     try:
-        # Check permissions
-        current_user_role = request.current_user.get('role_type')
-        current_user_id = request.current_user.get('user_id')
-        
-        if current_user_role == 'student':
-            student = Student.query.filter_by(user_id=current_user_id).first()
-            if not student or student.student_id != student_id:
-                return jsonify({'error': 'Access denied'}), 403
-        elif current_user_role not in ['admin', 'teacher', 'staff']:
-            return jsonify({'error': 'Access denied'}), 403
-        
         # Get query parameters
         subject_id = request.args.get('subject_id', type=int)
         assignment_type = request.args.get('assignment_type')
@@ -318,20 +455,10 @@ def get_student_grades(student_id):
 
 @student_bp.route('/<int:student_id>/attendance', methods=['GET'])
 @token_required
+@student_access_required()
 def get_student_attendance(student_id):
     """Get student attendance records"""
     try:
-        # Check permissions
-        current_user_role = request.current_user.get('role_type')
-        current_user_id = request.current_user.get('user_id')
-        
-        if current_user_role == 'student':
-            student = Student.query.filter_by(user_id=current_user_id).first()
-            if not student or student.student_id != student_id:
-                return jsonify({'error': 'Access denied'}), 403
-        elif current_user_role not in ['admin', 'teacher', 'staff']:
-            return jsonify({'error': 'Access denied'}), 403
-        
         # Get query parameters
         start_date = request.args.get('start_date')
         end_date = request.args.get('end_date')
@@ -355,20 +482,10 @@ def get_student_attendance(student_id):
 
 @student_bp.route('/<int:student_id>/financial', methods=['GET'])
 @token_required
+@student_access_required(staff_roles=('admin', 'staff'))
 def get_student_financial(student_id):
     """Get student financial information"""
     try:
-        # Check permissions
-        current_user_role = request.current_user.get('role_type')
-        current_user_id = request.current_user.get('user_id')
-        
-        if current_user_role == 'student':
-            student = Student.query.filter_by(user_id=current_user_id).first()
-            if not student or student.student_id != student_id:
-                return jsonify({'error': 'Access denied'}), 403
-        elif current_user_role not in ['admin', 'staff']:
-            return jsonify({'error': 'Access denied'}), 403
-        
         # Get invoices and payments
         invoices = Invoice.query.filter_by(student_id=student_id)\
             .order_by(Invoice.issue_date.desc()).all()
@@ -396,22 +513,21 @@ def get_student_financial(student_id):
 
 @student_bp.route('/<int:student_id>/report-cards', methods=['GET'])
 @token_required
+@student_access_required()
 def get_student_report_cards(student_id):
     """Get student report cards"""
     try:
-        # Check permissions
-        current_user_role = request.current_user.get('role_type')
-        current_user_id = request.current_user.get('user_id')
-        
-        if current_user_role == 'student':
-            student = Student.query.filter_by(user_id=current_user_id).first()
-            if not student or student.student_id != student_id:
-                return jsonify({'error': 'Access denied'}), 403
-        elif current_user_role not in ['admin', 'teacher', 'staff']:
-            return jsonify({'error': 'Access denied'}), 403
-        
+        # Answer conditional requests from a single MAX() before loading rows
+        last_generated = db.session.query(db.func.max(ReportCard.generated_at))\
+            .filter(ReportCard.student_id == student_id).scalar()
+        etag = _make_etag(last_generated)
+        if etag and request.if_none_match.contains(etag):
+            return '', 304
+
+        # The serialized academic year includes its deferred JSON blobs
         report_cards = ReportCard.query.filter_by(student_id=student_id)\
             .join(AcademicYear)\
+            .options(joinedload(ReportCard.academic_year).undefer_group('blob'))\
             .order_by(AcademicYear.start_date.desc(), ReportCard.term.desc()).all()
         
         result = []
@@ -419,8 +535,11 @@ def get_student_report_cards(student_id):
             report_data = report_card.to_dict()
             report_data['academic_year'] = report_card.academic_year.to_dict()
             result.append(report_data)
-        
-        return jsonify({'report_cards': result}), 200
+
+        response = jsonify({'report_cards': result})
+        if etag:
+            _conditional_response(response, etag)
+        return response, 200
         
     except Exception as e:
         return jsonify({'error': str(e)}), 500
@@ -1,35 +1,125 @@
-from flask import Blueprint, request, jsonify
+from flask import Blueprint, request, jsonify, Response
 from datetime import datetime, date
-from sqlalchemy import or_, and_
+import hashlib
+import time
 
-from src.models.user import db, User, Teacher, Class, Subject
-from src.models.assessment import Assignment, Grade, AttendanceRecord
-from src.routes.auth import token_required, role_required
+try:
+    import orjson
+except ImportError:
+    orjson = None
+
+from sqlalchemy import or_, and_, func, insert
+from sqlalchemy.dialects import postgresql, sqlite
+from sqlalchemy.exc import IntegrityError
+from sqlalchemy.orm import contains_eager, joinedload, raiseload, selectinload, undefer_group
+
+from src.models.user import db, User, Teacher, Class, Subject, Enrollment
+from src.models.assessment import Assignment, Grade, AttendanceRecord, Submission
+from src.routes.auth import token_required, role_required, teacher_access_required
 
 teacher_bp = Blueprint('teacher', __name__)
 
+# Short-lived cache for the teacher listing, keyed on the query string (same
+# scheme as the student listing cache). Writes clear it in the worker that
+# handled them; other workers serve entries at most TTL seconds stale.
+TEACHER_LIST_CACHE_TTL = 60  # seconds
+TEACHER_LIST_CACHE_MAX = 256  # entries; search makes the key space unbounded
+_teacher_list_cache = {}
+
+def _store_teacher_list_cache(key, payload):
+    """Insert a cache entry, sweeping expired ones once the cap is hit
+
+    search is caller-controlled, so without the cap any token holder
+    could grow the dict without bound.
+    """
+    now = time.monotonic()
+    if len(_teacher_list_cache) >= TEACHER_LIST_CACHE_MAX:
+        expired = [k for k, (expires_at, _) in _teacher_list_cache.items()
+                   if expires_at <= now]
+        for k in expired:
+            del _teacher_list_cache[k]
+        while len(_teacher_list_cache) >= TEACHER_LIST_CACHE_MAX:
+            # Everything is still fresh; evict the oldest insertion
+            del _teacher_list_cache[next(iter(_teacher_list_cache))]
+    _teacher_list_cache[key] = (now + TEACHER_LIST_CACHE_TTL, payload)
+
+# Upper bound on attendance records accepted per request
+MAX_ATTENDANCE_RECORDS = 500
+
+# Dialects with native ON CONFLICT upsert support for attendance recording
+_UPSERT_INSERTS = {
+    'postgresql': postgresql.insert,
+    'sqlite': sqlite.insert,
+}
+
+def _invalidate_teacher_list_cache():
+    """Clear all cached teacher listing responses"""
+    _teacher_list_cache.clear()
+
+def _teacher_list_etag():
+    """Build an ETag from cheap aggregates over the teacher table
+
+    Any create or profile update moves max(updated_at) or the row count,
+    so a matching ETag means the listing is unchanged.
+    """
+    last_modified, row_count = db.session.query(
+        func.max(User.updated_at), func.count(Teacher.teacher_id)
+    ).select_from(Teacher).join(User, Teacher.user_id == User.user_id).one()
+    if not last_modified:
+        return None
+    return hashlib.sha1(
+        f'{last_modified.isoformat()}:{row_count}'.encode()
+    ).hexdigest()
+
+def ojsonify(payload):
+    """Serialize large list payloads with orjson when available"""
+    if orjson is None:
+        return jsonify(payload)
+    return Response(orjson.dumps(payload, default=str), mimetype='application/json')
+
 @teacher_bp.route('/', methods=['GET'])
 @token_required
 @role_required(['admin', 'staff'])
 def get_teachers():
     """Get list of teachers with filtering and pagination"""
     try:
+        # Serve cached response bytes if a fresh entry exists for this query
+        cache_key = request.query_string.decode()
+        cached = _teacher_list_cache.get(cache_key)
+        if cached and cached[0] > time.monotonic():
+            return cached[1], 200, {'Content-Type': 'application/json'}
+
+        # Polling clients with an up-to-date copy skip the query and
+        # serialization work entirely
+        etag = _teacher_list_etag()
+        if etag and request.if_none_match.contains(etag):
+            return '', 304
+
         # Get query parameters
-        page = request.args.get('page', 1, type=int)
+        after_id = request.args.get('after_id', 0, type=int)
         per_page = min(request.args.get('per_page', 20, type=int), 100)
         search = request.args.get('search', '')
         department = request.args.get('department', '')
         employment_status = request.args.get('employment_status', '')
         
-        # Build query
-        query = Teacher.query.join(User)
-        
+        # Build query, materializing the joined User row in the same SELECT
+        # so the per-teacher user serialization below triggers no lazy loads;
+        # raiseload turns any future lazy access into an error rather than a
+        # silent per-row SELECT
+        query = Teacher.query.join(User).options(
+            # The listing serializes the lite teacher view, so the
+            # deferred JSON blobs stay out of the SELECT
+            contains_eager(Teacher.user), raiseload('*')
+        )
+
         # Apply filters
         if search:
+            # ILIKE patterns can be served by the trigram indexes on Postgres
+            pattern = f'%{search}%'
             query = query.filter(or_(
-                User.username.contains(search),
-                User.email.contains(search),
-                Teacher.employee_id.contains(search)
+                User.username.ilike(pattern),
+                User.email.ilike(pattern),
+                Teacher.employee_id.ilike(pattern)
             ))
         
         if department:
@@ -38,60 +128,73 @@ def get_teachers():
         if employment_status:
             query = query.filter(Teacher.employment_status == employment_status)
         
-        # Execute query with pagination
-        teachers = query.paginate(
-            page=page, per_page=per_page, error_out=False
-        )
-        
-        # Format response
+        # Keyset pagination: seek past the cursor and fetch one extra row
+        # to detect a next page, so page depth never affects query cost
+        rows = query.filter(Teacher.teacher_id > after_id)\
+            .order_by(Teacher.teacher_id.asc())\
+            .limit(per_page + 1).all()
+
+        has_next = len(rows) > per_page
+        teachers = rows[:per_page]
+
+        # All rows are materialized; return the connection to the pool
+        # before the serialization work below
+        db.session.close()
+
+        # Format response, mutating each row dict in place rather than
+        # rebuilding it with a {**...} merge
+        teacher_rows = []
+        for teacher in teachers:
+            row = teacher.to_dict(view='lite')
+            row['user'] = teacher.user.to_dict()
+            teacher_rows.append(row)
+
         result = {
-            'teachers': [
-                {
-                    **teacher.to_dict(),
-                    'user': teacher.user.to_dict()
-                } for teacher in teachers.items
-            ],
+            'teachers': teacher_rows,
+            # No total/pages: the COUNT(*) over the filtered join costs more
+            # than the page itself, and the cursor fields cover navigation
             'pagination': {
-                'page': page,
                 'per_page': per_page,
-                'total': teachers.total,
-                'pages': teachers.pages,
-                'has_next': teachers.has_next,
-                'has_prev': teachers.has_prev
+                'has_next': has_next,
+                'has_prev': after_id > 0,
+                'next_after_id': teachers[-1].teacher_id if has_next else None
             }
         }
-        
-        return jsonify(result), 200
-        
+
+        response = ojsonify(result)
+        if etag:
+            response.set_etag(etag)
+            response.cache_control.private = True
+            response.cache_control.max_age = 30
+        _store_teacher_list_cache(cache_key, response.get_data())
+        return response, 200
+
     except Exception as e:
         return jsonify({'error': str(e)}), 500
 
 @teacher_bp.route('/<int:teacher_id>', methods=['GET'])
 @token_required
+@teacher_access_required()
 def get_teacher(teacher_id):
     """Get specific teacher details"""
     try:
-        # Check permissions
-        current_user_role = request.current_user.get('role_type')
-        current_user_id = request.current_user.get('user_id')
-        
-        # Teachers can only view their own profile
-        if current_user_role == 'teacher':
-            teacher = Teacher.query.filter_by(user_id=current_user_id).first()
-            if not teacher or teacher.teacher_id != teacher_id:
-                return jsonify({'error': 'Access denied'}), 403
-        elif current_user_role not in ['admin', 'staff']:
-            return jsonify({'error': 'Access denied'}), 403
-        
-        teacher = Teacher.query.get(teacher_id)
+        teacher = db.session.get(Teacher, teacher_id, options=[
+            joinedload(Teacher.user),
+            selectinload(Teacher.classes).undefer_group('blob'),
+            undefer_group('blob')
+        ])
         if not teacher:
             return jsonify({'error': 'Teacher not found'}), 404
-        
-        # Get additional information
-        assigned_classes = Class.query.filter_by(teacher_id=teacher_id).all()
+
+        assigned_classes = teacher.classes
+        # Kept as its own LIMIT query: ix_assign_teacher_created serves the
+        # top-10 directly without loading the teacher's full assignment list
         recent_assignments = Assignment.query.filter_by(teacher_id=teacher_id)\
             .order_by(Assignment.created_at.desc()).limit(10).all()
-        
+
+        # Everything needed below is loaded; free the connection
+        db.session.close()
+
         result = {
             'teacher': teacher.to_dict(),
             'user': teacher.user.to_dict(),
@@ -118,20 +221,9 @@ def create_teacher():
             if not data.get(field):
                 return jsonify({'error': f'{field} is required'}), 400
         
-        # Check if user already exists
-        existing_user = User.query.filter(
-            (User.username == data['username']) | (User.email == data['email'])
-        ).first()
-        
-        if existing_user:
-            return jsonify({'error': 'User already exists'}), 409
-        
-        # Check if employee ID already exists
-        existing_teacher = Teacher.query.filter_by(employee_id=data['employee_id']).first()
-        if existing_teacher:
-            return jsonify({'error': 'Employee ID already exists'}), 409
-        
-        # Create user account
+        # Create user account; uniqueness of username/email/employee_id is
+        # enforced by the database constraints rather than pre-check queries
+        # (see the IntegrityError handler below)
         user = User(
             username=data['username'],
             email=data['email'],
@@ -146,7 +238,7 @@ def create_teacher():
         teacher = Teacher(
             user_id=user.user_id,
             employee_id=data['employee_id'],
-            hire_date=datetime.strptime(data['hire_date'], '%Y-%m-%d').date() if data.get('hire_date') else None,
+            hire_date=date.fromisoformat(data['hire_date']) if data.get('hire_date') else None,
             department=data.get('department'),
             salary=data.get('salary'),
             employment_status=data.get('employment_status', 'Active')
@@ -154,41 +246,39 @@ def create_teacher():
         
         # Set qualifications and subjects taught
         if data.get('qualifications'):
-            teacher.set_qualifications(data['qualifications'])
+            teacher.qualifications = data['qualifications']
         if data.get('subjects_taught'):
-            teacher.set_subjects_taught(data['subjects_taught'])
+            teacher.subjects_taught = data['subjects_taught']
         
         db.session.add(teacher)
         db.session.commit()
-        
+
+        _invalidate_teacher_list_cache()
+
         return jsonify({
             'message': 'Teacher created successfully',
             'teacher': teacher.to_dict(),
             'user': user.to_dict()
         }), 201
-        
+
+    except IntegrityError as e:
+        db.session.rollback()
+        if 'employee_id' in str(e.orig):
+            return jsonify({'error': 'Employee ID already exists'}), 409
+        return jsonify({'error': 'User already exists'}), 409
     except Exception as e:
         db.session.rollback()
         return jsonify({'error': str(e)}), 500
 
 @teacher_bp.route('/<int:teacher_id>', methods=['PUT'])
 @token_required
+@teacher_access_required()
 def update_teacher(teacher_id):
     """Update teacher information"""
     try:
-        # Check permissions
         current_user_role = request.current_user.get('role_type')
-        current_user_id = request.current_user.get('user_id')
-        
-        # Teachers can only update their own profile (limited fields)
-        if current_user_role == 'teacher':
-            teacher = Teacher.query.filter_by(user_id=current_user_id).first()
-            if not teacher or teacher.teacher_id != teacher_id:
-                return jsonify({'error': 'Access denied'}), 403
-        elif current_user_role not in ['admin', 'staff']:
-            return jsonify({'error': 'Access denied'}), 403
-        
-        teacher = Teacher.query.get(teacher_id)
+
+        teacher = db.session.get(Teacher, teacher_id)
         if not teacher:
             return jsonify({'error': 'Teacher not found'}), 404
         
@@ -208,7 +298,7 @@ def update_teacher(teacher_id):
                 teacher.employee_id = data['employee_id']
             
             if 'hire_date' in data:
-                teacher.hire_date = datetime.strptime(data['hire_date'], '%Y-%m-%d').date()
+                teacher.hire_date = date.fromisoformat(data['hire_date'])
             if 'department' in data:
                 teacher.department = data['department']
             if 'salary' in data:
@@ -216,20 +306,27 @@ def update_teacher(teacher_id):
             if 'employment_status' in data:
                 teacher.employment_status = data['employment_status']
             if 'qualifications' in data:
-                teacher.set_qualifications(data['qualifications'])
+                teacher.qualifications = data['qualifications']
             if 'subjects_taught' in data:
-                teacher.set_subjects_taught(data['subjects_taught'])
+                teacher.subjects_taught = data['subjects_taught']
         else:
             # Teachers can only update limited fields
             if 'qualifications' in data:
-                teacher.set_qualifications(data['qualifications'])
+                teacher.qualifications = data['qualifications']
         
         # Update user information if provided
         if 'email' in data and current_user_role in ['admin', 'staff']:
             teacher.user.email = data['email']
-        
+
+        # The listing ETag hashes max(users.updated_at); teacher-side
+        # edits must bump the user row or clients holding the old tag
+        # keep getting 304 with stale profile data
+        teacher.user.updated_at = datetime.utcnow()
+
         db.session.commit()
-        
+
+        _invalidate_teacher_list_cache()
+
         return jsonify({
             'message': 'Teacher updated successfully',
             'teacher': teacher.to_dict()
@@ -241,31 +338,29 @@ def update_teacher(teacher_id):
 
 @teacher_bp.route('/<int:teacher_id>/classes', methods=['GET'])
 @token_required
+@teacher_access_required()
 def get_teacher_classes(teacher_id):
     """Get classes assigned to teacher"""
     try:
-        # Check permissions
-        current_user_role = request.current_user.get('role_type')
-        current_user_id = request.current_user.get('user_id')
-        
-        if current_user_role == 'teacher':
-            teacher = Teacher.query.filter_by(user_id=current_user_id).first()
-            if not teacher or teacher.teacher_id != teacher_id:
-                return jsonify({'error': 'Access denied'}), 403
-        elif current_user_role not in ['admin', 'staff']:
-            return jsonify({'error': 'Access denied'}), 403
-        
-        classes = Class.query.filter_by(teacher_id=teacher_id, is_active=True).all()
-        
+        classes = Class.query.filter_by(teacher_id=teacher_id, is_active=True)\
+            .options(undefer_group('blob')).all()
+
+        # One GROUP BY over all the teacher's classes instead of a COUNT
+        # query per class
+        class_ids = [cls.class_id for cls in classes]
+        enrollment_counts = dict(
+            db.session.query(Enrollment.class_id, func.count(Enrollment.enrollment_id))
+            .filter(Enrollment.class_id.in_(class_ids), Enrollment.status == 'Active')
+            .group_by(Enrollment.class_id).all()
+        ) if class_ids else {}
+
+        # Everything needed below is loaded; free the connection
+        db.session.close()
+
         result = []
         for cls in classes:
             class_data = cls.to_dict()
-            # Get enrollment count
-            from src.models.user import Enrollment
-            enrollment_count = Enrollment.query.filter_by(
-                class_id=cls.class_id, status='Active'
-            ).count()
-            class_data['enrollment_count'] = enrollment_count
+            class_data['enrollment_count'] = enrollment_counts.get(cls.class_id, 0)
             result.append(class_data)
         
         return jsonify({'classes': result}), 200
@@ -275,20 +370,10 @@ def get_teacher_classes(teacher_id):
 
 @teacher_bp.route('/<int:teacher_id>/assignments', methods=['GET'])
 @token_required
+@teacher_access_required()
 def get_teacher_assignments(teacher_id):
     """Get assignments created by teacher"""
     try:
-        # Check permissions
-        current_user_role = request.current_user.get('role_type')
-        current_user_id = request.current_user.get('user_id')
-        
-        if current_user_role == 'teacher':
-            teacher = Teacher.query.filter_by(user_id=current_user_id).first()
-            if not teacher or teacher.teacher_id != teacher_id:
-                return jsonify({'error': 'Access denied'}), 403
-        elif current_user_role not in ['admin', 'staff']:
-            return jsonify({'error': 'Access denied'}), 403
-        
         # Get query parameters
         class_id = request.args.get('class_id', type=int)
         subject_id = request.args.get('subject_id', type=int)
@@ -306,39 +391,37 @@ def get_teacher_assignments(teacher_id):
             query = query.filter(Assignment.assignment_type == assignment_type)
         
         assignments = query.order_by(Assignment.created_at.desc()).all()
-        
+
+        # One GROUP BY for all assignments instead of a COUNT query each
+        assignment_ids = [a.assignment_id for a in assignments]
+        submission_counts = dict(
+            db.session.query(Submission.assignment_id, func.count(Submission.submission_id))
+            .filter(Submission.assignment_id.in_(assignment_ids))
+            .group_by(Submission.assignment_id).all()
+        ) if assignment_ids else {}
+
+        # Everything needed below is loaded; free the connection
+        db.session.close()
+
         result = []
         for assignment in assignments:
             assignment_data = assignment.to_dict()
-            # Get submission count
-            from src.models.assessment import Submission
-            submission_count = Submission.query.filter_by(
-                assignment_id=assignment.assignment_id
-            ).count()
-            assignment_data['submission_count'] = submission_count
+            assignment_data['submission_count'] = submission_counts.get(
+                assignment.assignment_id, 0
+            )
             result.append(assignment_data)
-        
-        return jsonify({'assignments': result}), 200
+
+        return ojsonify({'assignments': result}), 200
         
     except Exception as e:
         return jsonify({'error': str(e)}), 500
 
 @teacher_bp.route('/<int:teacher_id>/assignments', methods=['POST'])
 @token_required
+@teacher_access_required()
 def create_assignment(teacher_id):
     """Create new assignment"""
     try:
-        # Check permissions
-        current_user_role = request.current_user.get('role_type')
-        current_user_id = request.current_user.get('user_id')
-        
-        if current_user_role == 'teacher':
-            teacher = Teacher.query.filter_by(user_id=current_user_id).first()
-            if not teacher or teacher.teacher_id != teacher_id:
-                return jsonify({'error': 'Access denied'}), 403
-        elif current_user_role not in ['admin', 'staff']:
-            return jsonify({'error': 'Access denied'}), 403
-        
         data = request.get_json()
         
         # Validate required fields
@@ -361,7 +444,7 @@ def create_assignment(teacher_id):
             teacher_id=teacher_id,
             title=data['title'],
             description=data.get('description'),
-            due_date=datetime.strptime(data['due_date'], '%Y-%m-%d').date(),
+            due_date=date.fromisoformat(data['due_date']),
             max_points=data.get('max_points'),
             weight_factor=data.get('weight_factor', 1.0),
             assignment_type=data.get('assignment_type', 'Assignment'),
@@ -369,7 +452,7 @@ def create_assignment(teacher_id):
         )
         
         if data.get('grading_criteria'):
-            assignment.set_grading_criteria(data['grading_criteria'])
+            assignment.grading_criteria = data['grading_criteria']
         
         db.session.add(assignment)
         db.session.commit()
@@ -385,62 +468,54 @@ def create_assignment(teacher_id):
 
 @teacher_bp.route('/<int:teacher_id>/grades', methods=['GET'])
 @token_required
+@teacher_access_required()
 def get_teacher_grades(teacher_id):
     """Get grades given by teacher"""
     try:
-        # Check permissions
-        current_user_role = request.current_user.get('role_type')
-        current_user_id = request.current_user.get('user_id')
-        
-        if current_user_role == 'teacher':
-            teacher = Teacher.query.filter_by(user_id=current_user_id).first()
-            if not teacher or teacher.teacher_id != teacher_id:
-                return jsonify({'error': 'Access denied'}), 403
-        elif current_user_role not in ['admin', 'staff']:
-            return jsonify({'error': 'Access denied'}), 403
-        
         # Get query parameters
         assignment_id = request.args.get('assignment_id', type=int)
         student_id = request.args.get('student_id', type=int)
         
-        query = Grade.query.filter_by(teacher_id=teacher_id)
-        
+        # Eager-load the assignment and student rows serialized below so the
+        # loop does not issue two lazy SELECTs per grade
+        query = Grade.query.filter_by(teacher_id=teacher_id).options(
+            joinedload(Grade.assignment),
+            joinedload(Grade.student).undefer_group('blob')
+        )
+
         if assignment_id:
             query = query.filter(Grade.assignment_id == assignment_id)
         
         if student_id:
             query = query.filter(Grade.student_id == student_id)
         
-        grades = query.order_by(Grade.graded_at.desc()).all()
-        
+        # Stream ORM rows in batches so an unfiltered teacher history never
+        # holds every Grade instance in memory at once; the many-to-one
+        # joinedloads above are compatible with yield_per
         result = []
-        for grade in grades:
+        for grade in query.order_by(Grade.graded_at.desc()).yield_per(500):
             grade_data = grade.to_dict()
             grade_data['assignment'] = grade.assignment.to_dict()
             grade_data['student'] = grade.student.to_dict()
             result.append(grade_data)
-        
-        return jsonify({'grades': result}), 200
+
+        # The streaming cursor is exhausted; free the connection before
+        # serializing
+        db.session.close()
+
+        return ojsonify({'grades': result}), 200
         
     except Exception as e:
         return jsonify({'error': str(e)}), 500
 
 @teacher_bp.route('/<int:teacher_id>/attendance', methods=['POST'])
 @token_required
+@teacher_access_required()
 def record_attendance(teacher_id):
     """Record student attendance"""
     try:
-        # Check permissions
-        current_user_role = request.current_user.get('role_type')
         current_user_id = request.current_user.get('user_id')
-        
-        if current_user_role == 'teacher':
-            teacher = Teacher.query.filter_by(user_id=current_user_id).first()
-            if not teacher or teacher.teacher_id != teacher_id:
-                return jsonify({'error': 'Access denied'}), 403
-        elif current_user_role not in ['admin', 'staff']:
-            return jsonify({'error': 'Access denied'}), 403
-        
+
         data = request.get_json()
         
         # Validate required fields
@@ -456,42 +531,90 @@ def record_attendance(teacher_id):
         if not assigned_class:
             return jsonify({'error': 'Teacher not assigned to this class'}), 403
         
-        attendance_date = datetime.strptime(data['attendance_date'], '%Y-%m-%d').date()
-        
-        # Process attendance records
-        created_records = []
-        for record_data in data['attendance_records']:
-            # Check if attendance already exists for this date
-            existing_record = AttendanceRecord.query.filter_by(
-                student_id=record_data['student_id'],
-                class_id=data['class_id'],
-                attendance_date=attendance_date
-            ).first()
-            
-            if existing_record:
-                # Update existing record
-                existing_record.status = record_data['status']
-                existing_record.remarks = record_data.get('remarks')
-                existing_record.recorded_by = current_user_id
-                created_records.append(existing_record)
-            else:
-                # Create new record
-                attendance_record = AttendanceRecord(
-                    student_id=record_data['student_id'],
-                    class_id=data['class_id'],
-                    attendance_date=attendance_date,
-                    status=record_data['status'],
-                    remarks=record_data.get('remarks'),
-                    recorded_by=current_user_id
-                )
-                db.session.add(attendance_record)
-                created_records.append(attendance_record)
-        
+        attendance_date = date.fromisoformat(data['attendance_date'])
+
+        attendance_records = data['attendance_records']
+        if len(attendance_records) > MAX_ATTENDANCE_RECORDS:
+            return jsonify({
+                'error': f'Too many attendance records (max {MAX_ATTENDANCE_RECORDS})'
+            }), 413
+
+        # Drop duplicate student_ids up front, keeping the first occurrence,
+        # so repeated entries in the payload cost no extra database work
+        seen_student_ids = set()
+        rows = []
+        for record_data in attendance_records:
+            student_id = record_data['student_id']
+            if student_id in seen_student_ids:
+                continue
+            seen_student_ids.add(student_id)
+            rows.append({
+                'student_id': student_id,
+                'class_id': data['class_id'],
+                'attendance_date': attendance_date,
+                'status': record_data['status'],
+                'remarks': record_data.get('remarks'),
+                'recorded_by': current_user_id
+            })
+
+        upsert = _UPSERT_INSERTS.get(db.session.get_bind().dialect.name)
+        if upsert is not None:
+            # Single upsert keyed on the (student, class, date) unique
+            # constraint instead of a SELECT-then-INSERT/UPDATE per student
+            stmt = upsert(AttendanceRecord).values(rows)
+            stmt = stmt.on_conflict_do_update(
+                index_elements=['student_id', 'class_id', 'attendance_date'],
+                set_={
+                    'status': stmt.excluded.status,
+                    'remarks': stmt.excluded.remarks,
+                    'recorded_by': stmt.excluded.recorded_by
+                }
+            )
+            db.session.execute(stmt)
+        else:
+            # Fallback for dialects without ON CONFLICT support: one SELECT
+            # for the day's existing records, then a single executemany
+            # INSERT for the rest instead of a query per student
+            existing_by_student = {
+                record.student_id: record
+                for record in AttendanceRecord.query.filter(
+                    AttendanceRecord.class_id == data['class_id'],
+                    AttendanceRecord.attendance_date == attendance_date,
+                    AttendanceRecord.student_id.in_(
+                        [row['student_id'] for row in rows]
+                    )
+                ).all()
+            }
+
+            new_rows = []
+            for row in rows:
+                existing_record = existing_by_student.get(row['student_id'])
+                if existing_record:
+                    existing_record.status = row['status']
+                    existing_record.remarks = row['remarks']
+                    existing_record.recorded_by = current_user_id
+                else:
+                    new_rows.append(row)
+
+            if new_rows:
+                db.session.execute(insert(AttendanceRecord), new_rows)
+
         db.session.commit()
-        
+
+        # Read-your-own-writes: this reload must see the rows committed
+        # above, so pin it to the primary rather than a lagging replica.
+        # db.session() resolves the actual session; the scoped proxy only
+        # forwards SQLAlchemy's own methods.
+        with db.session().use_primary():
+            records = AttendanceRecord.query.filter(
+                AttendanceRecord.class_id == data['class_id'],
+                AttendanceRecord.attendance_date == attendance_date,
+                AttendanceRecord.student_id.in_([row['student_id'] for row in rows])
+            ).all()
+
         return jsonify({
             'message': 'Attendance recorded successfully',
-            'records': [record.to_dict() for record in created_records]
+            'records': [record.to_dict() for record in records]
         }), 201
         
     except Exception as e:
@@ -1,12 +1,268 @@
 from flask_sqlalchemy import SQLAlchemy
-from sqlalchemy import Numeric
+from flask_sqlalchemy.session import Session as FlaskSession
+from sqlalchemy import Numeric, DDL, event, Text, TypeDecorator
+from sqlalchemy.dialects.postgresql import JSONB
+from sqlalchemy.orm import deferred, load_only, selectinload
+from sqlalchemy.sql import Select
+from contextlib import contextmanager
 from datetime import datetime, date
+from functools import partial
 from werkzeug.security import generate_password_hash, check_password_hash
+import hashlib
+import hmac
 import json
 
-db = SQLAlchemy()
+try:
+    import orjson
+except ImportError:
+    orjson = None
+
+try:
+    import bcrypt
+except ImportError:
+    bcrypt = None
+
+# Cost tuned for roughly 250ms per hash on current hardware; pinning the
+# scheme and parameter here also insulates stored hashes from werkzeug
+# changing its defaults between versions
+BCRYPT_ROUNDS = 12
+
+def hash_password(password):
+    """Hash with the preferred scheme: bcrypt when available, else werkzeug
+
+    The single scheme-selection point for new hashes — set_password and
+    the process-pool hashing in the student routes (which needs a
+    picklable module-level callable) both go through it.
+    """
+    if bcrypt is not None:
+        return bcrypt.hashpw(
+            password.encode(), bcrypt.gensalt(rounds=BCRYPT_ROUNDS)
+        ).decode()
+    return generate_password_hash(password)
+
+# werkzeug's check_password_hash re-parses the method$salt$hash string
+# and re-derives the hash function on every call. The stored legacy
+# hashes share a handful of PBKDF2 schemes, so cache one KDF per method
+# string and compare with hmac.compare_digest; anything that is not
+# plain PBKDF2 falls back to werkzeug's own parser.
+_pbkdf2_kdfs = {}
+
+def _check_legacy_hash(pwhash, password):
+    method, _, rest = pwhash.partition('$')
+    salt, _, hashval = rest.partition('$')
+    kdf = _pbkdf2_kdfs.get(method)
+    if kdf is None:
+        parts = method.split(':')
+        if len(parts) != 3 or parts[0] != 'pbkdf2' or not parts[2].isdigit():
+            return check_password_hash(pwhash, password)
+        kdf = partial(hashlib.pbkdf2_hmac, parts[1], iterations=int(parts[2]))
+        _pbkdf2_kdfs[method] = kdf
+    derived = kdf(password.encode(), salt.encode()).hex()
+    return hmac.compare_digest(derived, hashval)
+
+# JSON text columns are decoded and encoded through these hooks so the
+# whole model layer picks up orjson when it is installed
+if orjson is not None:
+    _loads = orjson.loads
+
+    def _dumps(obj):
+        return orjson.dumps(obj).decode()
+else:
+    _loads = json.loads
+    _dumps = json.dumps
+
+class JSONDocument(TypeDecorator):
+    """JSON column stored as JSONB on Postgres and serialized text elsewhere
+
+    Attribute values are plain dicts/lists either way: the Postgres
+    driver parses JSONB natively, other dialects round-trip through the
+    _loads/_dumps hooks above.
+    """
+
+    impl = Text
+    cache_ok = True
+
+    def load_dialect_impl(self, dialect):
+        if dialect.name == 'postgresql':
+            return dialect.type_descriptor(JSONB())
+        return dialect.type_descriptor(Text())
+
+    def process_bind_param(self, value, dialect):
+        if value is None or dialect.name == 'postgresql':
+            return value
+        return _dumps(value)
+
+    def process_result_value(self, value, dialect):
+        if value is None or dialect.name == 'postgresql':
+            return value
+        return _loads(value)
+
+class ReadRoutingSession(FlaskSession):
+    """Session that routes plain SELECTs to the 'replica' bind when set
+
+    Writes, flushes and anything inside an explicit transaction stay on
+    the primary; with no replica bind configured (the SQLite default)
+    behaviour is unchanged. Once the session has written anything — an
+    ORM flush or explicit DML — every later read in its lifetime stays
+    on the primary too: commit expires loaded objects, and the attribute
+    refreshes that rebuild them (plus any explicit post-write reload)
+    must observe rows a lagging replica may not have yet. use_primary()
+    remains for pinning reads that need primary consistency before the
+    session has written.
+    """
+
+    _pin_primary = 0
+    _wrote = False
+
+    @contextmanager
+    def use_primary(self):
+        """Pin reads to the primary for a read-your-own-writes section"""
+        self._pin_primary += 1
+        try:
+            yield
+        finally:
+            self._pin_primary -= 1
+
+    def get_bind(self, mapper=None, clause=None, **kwargs):
+        if self._flushing or (clause is not None
+                              and not isinstance(clause, Select)):
+            # Flushes only run when there is real write work, and any
+            # non-SELECT statement is DML or DDL: from here on this
+            # session reads its own writes from the primary. The flag
+            # dies with the request-scoped session.
+            self._wrote = True
+        elif not self._wrote and not self._pin_primary \
+                and isinstance(clause, Select):
+            engines = self._db.engines
+            if 'replica' in engines:
+                return engines['replica']
+        return super().get_bind(mapper=mapper, clause=clause, **kwargs)
+
+db = SQLAlchemy(session_options={'class_': ReadRoutingSession})
+
+# Serializer codegen: each model declares its output as a _to_dict_fields
+# spec and the decorator below compiles a to_dict for it once at import
+# time, so per-row serialization is one literal dict display with no
+# reflection. Kinds: 'plain' copies the attribute, 'date'/'datetime'
+# isoformat their values through unbound methods hoisted below,
+# 'json_list'/'json_dict' read JSONDocument attributes with the matching
+# empty default. Each non-plain field reads its attribute exactly once
+# via the walrus binding. Numeric columns are declared asdecimal=False
+# where nothing computes on them, so they serialize as 'plain'.
+_date_iso = date.isoformat
+_dt_iso = datetime.isoformat
+
+# Shared fallback for NULL JSON list columns: tuples serialize as JSON
+# arrays under both encoders, so empty blobs stop allocating a throwaway
+# [] per row. NULL dict columns keep a fresh {} — neither encoder can
+# serialize an immutable mapping and a shared mutable one would leak
+# writes across instances.
+_EMPTY_LIST = ()
+
+_FIELD_TEMPLATES = {
+    'plain': "{key!r}: self.{key}",
+    'date': "{key!r}: None if (v := self.{key}) is None else _date_iso(v)",
+    'datetime': "{key!r}: None if (v := self.{key}) is None else _dt_iso(v)",
+    'json_list': "{key!r}: self.{key} or _EMPTY_LIST",
+    'json_dict': "{key!r}: self.{key} or {{}}",
+}
+
+def _bump_serial(mapper, connection, target):
+    target._serial_version += 1
+
+def _compile_build(cls, name, fields):
+    items = ',\n        '.join(
+        _FIELD_TEMPLATES[kind].format(key=key)
+        for key, kind in fields
+    )
+    source = 'def %s(self):\n    return {\n        %s\n    }\n' % (name, items)
+    namespace = {'_date_iso': _date_iso, '_dt_iso': _dt_iso,
+                 '_EMPTY_LIST': _EMPTY_LIST}
+    exec(compile(source, '<%s:%s>' % (name, cls.__name__), 'exec'), namespace)
+    return namespace[name]
+
+def _compiled_to_dict(cls):
+    """Class decorator that builds cls.to_dict from cls._to_dict_fields
+
+    Two bodies are compiled per model: the full view covers every
+    declared field, the lite view drops the JSON document columns so
+    list traffic neither loads nor serializes the deferred blobs.
+    to_dict(view='lite') selects the latter.
+
+    The full view runs behind an instance-level cache: the built dict is
+    remembered with a freshness token and repeated calls return a
+    shallow copy until the row changes. Models with an updated_at column
+    key on it; the rest key on a version counter bumped by a
+    before_update listener. Callers get a fresh copy every time, so the
+    usual pattern of annotating the dict with extra keys stays safe.
+    """
+    lite_fields = tuple(
+        (key, kind) for key, kind in cls._to_dict_fields
+        if kind not in ('json_list', 'json_dict')
+    )
+    build_full = _compile_build(cls, '_build_dict', cls._to_dict_fields)
+    build_lite = _compile_build(cls, '_build_dict_lite', lite_fields)
+    cls._build_dict = build_full
+    cls._build_dict_lite = build_lite
+    cls._to_dict_cache = (None, None)
+
+    if hasattr(cls, 'updated_at'):
+        def _token(self):
+            return self.updated_at
+    else:
+        cls._serial_version = 0
+        event.listen(cls, 'before_update', _bump_serial)
+
+        def _token(self):
+            return self._serial_version
+
+    def to_dict(self, view='full'):
+        if view == 'lite':
+            return build_lite(self)
+        token = _token(self)
+        cached_token, cached = self._to_dict_cache
+        if cached is None or cached_token != token:
+            cached = build_full(self)
+            self._to_dict_cache = (token, cached)
+        return dict(cached)
+
+    cls.to_dict = to_dict
+
+    # Column sets for bulk serialization: the full view loads every
+    # serialized column (deferred blob group included) with the row, the
+    # lite view leaves the blobs out of the SELECT entirely
+    cols_full = tuple(getattr(cls, key) for key, _ in cls._to_dict_fields)
+    cols_lite = tuple(getattr(cls, key) for key, _ in lite_fields)
+
+    def bulk_to_dict(cls, query, view='full'):
+        """Serialize every row of query via a single column-limited SELECT"""
+        if view == 'lite':
+            rows = query.options(load_only(*cols_lite)).all()
+            return [build_lite(row) for row in rows]
+        rows = query.options(load_only(*cols_full)).all()
+        return [to_dict(row) for row in rows]
+
+    cls.bulk_to_dict = classmethod(bulk_to_dict)
+    return cls
+
+# Relationship loading policy: every relationship declares its lazy
+# strategy explicitly. Do not use lazy='dynamic' (every attribute access
+# becomes a fresh query) or lazy='subquery' (re-runs the original query
+# per load); collections stay lazy='select' and are selectinload()'d at
+# the query sites that need them.
 
 # User Management Models
+
+# Role -> one-to-one profile relationship, resolved by User.profile so
+# callers stop branching over all four relationships per user
+_PROFILE_RELS = {
+    'student': 'student_profile',
+    'teacher': 'teacher_profile',
+    'parent': 'parent_profile',
+    'staff': 'staff_profile',
+}
+
+@_compiled_to_dict
 class User(db.Model):
     __tablename__ = 'users'
     
@@ -19,30 +275,65 @@ class User(db.Model):
     created_at = db.Column(db.DateTime, default=datetime.utcnow)
     last_login = db.Column(db.DateTime)
     updated_at = db.Column(db.DateTime, default=datetime.utcnow, onupdate=datetime.utcnow)
-    
+
+    # Login resolves username/email plus the is_active check on every
+    # request; keep it a single index seek
+    __table_args__ = (
+        db.Index('ix_users_username_active', 'username', 'is_active'),
+        db.Index('ix_users_email_active', 'email', 'is_active'),
+        # Role filtering appears in most listing and permission queries
+        db.Index('ix_users_role_active', 'role_type', 'is_active'),
+    )
+
     # Relationships
-    student_profile = db.relationship('Student', backref='user', uselist=False)
-    teacher_profile = db.relationship('Teacher', backref='user', uselist=False)
-    parent_profile = db.relationship('Parent', backref='user', uselist=False)
-    staff_profile = db.relationship('Staff', backref='user', uselist=False)
+    student_profile = db.relationship('Student', back_populates='user', uselist=False, lazy='select')
+    teacher_profile = db.relationship('Teacher', back_populates='user', uselist=False, lazy='select')
+    parent_profile = db.relationship('Parent', back_populates='user', uselist=False, lazy='select')
+    staff_profile = db.relationship('Staff', back_populates='user', uselist=False, lazy='select')
     
     def set_password(self, password):
-        self.password_hash = generate_password_hash(password)
-    
+        self.password_hash = hash_password(password)
+
     def check_password(self, password):
-        return check_password_hash(self.password_hash, password)
-    
-    def to_dict(self):
-        return {
-            'user_id': self.user_id,
-            'username': self.username,
-            'email': self.email,
-            'role_type': self.role_type,
-            'is_active': self.is_active,
-            'created_at': self.created_at.isoformat() if self.created_at else None,
-            'last_login': self.last_login.isoformat() if self.last_login else None
-        }
+        # Dispatch on the stored format so werkzeug-era hashes keep
+        # verifying after the switch to bcrypt
+        if self.password_hash.startswith('$2'):
+            if bcrypt is None:
+                return False
+            return bcrypt.checkpw(password.encode(), self.password_hash.encode())
+        return _check_legacy_hash(self.password_hash, password)
+
+    def password_needs_rehash(self):
+        """True when the stored hash predates the preferred bcrypt scheme"""
+        return bcrypt is not None and not self.password_hash.startswith('$2')
+
+    @property
+    def profile(self):
+        """The role-matching one-to-one profile row, if any"""
+        rel = _PROFILE_RELS.get(self.role_type)
+        return getattr(self, rel) if rel else None
+
+    _to_dict_fields = (
+        ('user_id', 'plain'),
+        ('username', 'plain'),
+        ('email', 'plain'),
+        ('role_type', 'plain'),
+        ('is_active', 'plain'),
+        ('created_at', 'datetime'),
+        ('last_login', 'datetime'),
+    )
 
+# Loader options for endpoints that serialize user.profile across many
+# rows: four batched selectin queries up front instead of one lazy
+# SELECT per user. Single-user paths can keep the plain lazy load.
+USER_PROFILE_LOADS = (
+    selectinload(User.student_profile),
+    selectinload(User.teacher_profile),
+    selectinload(User.parent_profile),
+    selectinload(User.staff_profile),
+)
+
+@_compiled_to_dict
 class Student(db.Model):
     __tablename__ = 'students'
     
@@ -52,121 +343,137 @@ class Student(db.Model):
     date_of_birth = db.Column(db.Date)
     gender = db.Column(db.String(10))
     address = db.Column(db.Text)
-    emergency_contacts = db.Column(db.Text)  # JSON string
-    medical_information = db.Column(db.Text)  # JSON string
+    # JSON blobs are deferred as a group: list queries skip them and the
+    # full-profile endpoints opt back in with undefer_group('blob')
+    emergency_contacts = deferred(db.Column(JSONDocument), group='blob')
+    medical_information = deferred(db.Column(JSONDocument), group='blob')
     academic_status = db.Column(db.String(50), default='Active')
     enrollment_date = db.Column(db.Date, default=date.today)
     graduation_date = db.Column(db.Date)
-    
-    # Relationships
-    enrollments = db.relationship('Enrollment', backref='student', lazy=True)
-    submissions = db.relationship('Submission', backref='student', lazy=True)
-    grades = db.relationship('Grade', backref='student', lazy=True)
-    report_cards = db.relationship('ReportCard', backref='student', lazy=True)
-    invoices = db.relationship('Invoice', backref='student', lazy=True)
-    payments = db.relationship('Payment', backref='student', lazy=True)
-    attendance_records = db.relationship('AttendanceRecord', backref='student', lazy=True)
-    book_transactions = db.relationship('BookTransaction', backref='student', lazy=True)
-    
-    def get_emergency_contacts(self):
-        return json.loads(self.emergency_contacts) if self.emergency_contacts else []
-    
-    def set_emergency_contacts(self, contacts):
-        self.emergency_contacts = json.dumps(contacts)
-    
-    def get_medical_information(self):
-        return json.loads(self.medical_information) if self.medical_information else {}
-    
-    def set_medical_information(self, info):
-        self.medical_information = json.dumps(info)
-    
-    def to_dict(self):
-        return {
-            'student_id': self.student_id,
-            'user_id': self.user_id,
-            'admission_number': self.admission_number,
-            'date_of_birth': self.date_of_birth.isoformat() if self.date_of_birth else None,
-            'gender': self.gender,
-            'address': self.address,
-            'emergency_contacts': self.get_emergency_contacts(),
-            'medical_information': self.get_medical_information(),
-            'academic_status': self.academic_status,
-            'enrollment_date': self.enrollment_date.isoformat() if self.enrollment_date else None,
-            'graduation_date': self.graduation_date.isoformat() if self.graduation_date else None
-        }
 
+    # One profile row per user; the unique index also makes the
+    # User -> Student join an index seek
+    __table_args__ = (
+        db.Index('ix_student_user_id', 'user_id', unique=True),
+    )
+
+    # Relationships; the owning user row is serialized with nearly every
+    # student, so it is batch-loaded. Models outside this package keep
+    # their backref form until they declare the reverse side themselves.
+    user = db.relationship('User', back_populates='student_profile', lazy='selectin')
+    enrollments = db.relationship('Enrollment', back_populates='student', lazy='select')
+    submissions = db.relationship('Submission', back_populates='student', lazy='select')
+    grades = db.relationship('Grade', back_populates='student', lazy='select')
+    report_cards = db.relationship('ReportCard', back_populates='student', lazy='select')
+    invoices = db.relationship('Invoice', backref='student', lazy='select')
+    payments = db.relationship('Payment', backref='student', lazy='select')
+    attendance_records = db.relationship('AttendanceRecord', back_populates='student', lazy='select')
+    book_transactions = db.relationship('BookTransaction', backref='student', lazy='select')
+    
+    _to_dict_fields = (
+        ('student_id', 'plain'),
+        ('user_id', 'plain'),
+        ('admission_number', 'plain'),
+        ('date_of_birth', 'date'),
+        ('gender', 'plain'),
+        ('address', 'plain'),
+        ('emergency_contacts', 'json_list'),
+        ('medical_information', 'json_dict'),
+        ('academic_status', 'plain'),
+        ('enrollment_date', 'date'),
+        ('graduation_date', 'date'),
+    )
+
+@_compiled_to_dict
 class Teacher(db.Model):
     __tablename__ = 'teachers'
     
     teacher_id = db.Column(db.Integer, primary_key=True)
     user_id = db.Column(db.Integer, db.ForeignKey('users.user_id'), nullable=False)
     employee_id = db.Column(db.String(50), unique=True, nullable=False)
-    qualifications = db.Column(db.Text)  # JSON string
-    subjects_taught = db.Column(db.Text)  # JSON string
+    qualifications = deferred(db.Column(JSONDocument), group='blob')
+    subjects_taught = deferred(db.Column(JSONDocument), group='blob')
     hire_date = db.Column(db.Date)
     department = db.Column(db.String(100))
-    performance_metrics = db.Column(db.Text)  # JSON string
-    salary = db.Column(Numeric(10, 2))
+    performance_metrics = deferred(db.Column(JSONDocument), group='blob')
+    # asdecimal=False: salary is only stored and serialized, never
+    # computed on, so skip the per-row Decimal round-trip
+    salary = db.Column(Numeric(10, 2, asdecimal=False))
     employment_status = db.Column(db.String(50), default='Active')
-    
+
+    # Matches the teacher listing filters and the join from users
+    __table_args__ = (
+        db.Index('ix_teacher_dept_status', 'department', 'employment_status'),
+        # Unique: one profile row per user, and the join from users is a seek
+        db.Index('ix_teacher_user_id', 'user_id', unique=True),
+    )
+
     # Relationships
-    classes = db.relationship('Class', backref='teacher', lazy=True)
-    assignments = db.relationship('Assignment', backref='teacher', lazy=True)
-    grades = db.relationship('Grade', backref='teacher', lazy=True)
-    
-    def get_qualifications(self):
-        return json.loads(self.qualifications) if self.qualifications else []
-    
-    def set_qualifications(self, quals):
-        self.qualifications = json.dumps(quals)
-    
-    def get_subjects_taught(self):
-        return json.loads(self.subjects_taught) if self.subjects_taught else []
-    
-    def set_subjects_taught(self, subjects):
-        self.subjects_taught = json.dumps(subjects)
-    
-    def to_dict(self):
-        return {
-            'teacher_id': self.teacher_id,
-            'user_id': self.user_id,
-            'employee_id': self.employee_id,
-            'qualifications': self.get_qualifications(),
-            'subjects_taught': self.get_subjects_taught(),
-            'hire_date': self.hire_date.isoformat() if self.hire_date else None,
-            'department': self.department,
-            'salary': float(self.salary) if self.salary else None,
-            'employment_status': self.employment_status
-        }
+    user = db.relationship('User', back_populates='teacher_profile', lazy='select')
+    classes = db.relationship('Class', back_populates='teacher', lazy='select')
+    assignments = db.relationship('Assignment', back_populates='teacher', lazy='select')
+    grades = db.relationship('Grade', back_populates='teacher', lazy='select')
+    
+    _to_dict_fields = (
+        ('teacher_id', 'plain'),
+        ('user_id', 'plain'),
+        ('employee_id', 'plain'),
+        ('qualifications', 'json_list'),
+        ('subjects_taught', 'json_list'),
+        ('hire_date', 'date'),
+        ('department', 'plain'),
+        ('salary', 'plain'),
+        ('employment_status', 'plain'),
+    )
+
+# Trigram GIN indexes so the ILIKE substring search in the listing endpoints
+# becomes an index probe on PostgreSQL. Plain b-tree indexes cannot serve
+# '%term%' patterns; other dialects keep their scan behaviour.
+event.listen(User.__table__, 'after_create', DDL(
+    "CREATE EXTENSION IF NOT EXISTS pg_trgm"
+).execute_if(dialect='postgresql'))
+event.listen(User.__table__, 'after_create', DDL(
+    "CREATE INDEX ix_user_username_trgm ON users USING gin (username gin_trgm_ops)"
+).execute_if(dialect='postgresql'))
+event.listen(User.__table__, 'after_create', DDL(
+    "CREATE INDEX ix_user_email_trgm ON users USING gin (email gin_trgm_ops)"
+).execute_if(dialect='postgresql'))
+event.listen(Teacher.__table__, 'after_create', DDL(
+    "CREATE INDEX ix_teacher_employee_id_trgm ON teachers USING gin (employee_id gin_trgm_ops)"
+).execute_if(dialect='postgresql'))
 
+@_compiled_to_dict
 class Parent(db.Model):
     __tablename__ = 'parents'
     
     parent_id = db.Column(db.Integer, primary_key=True)
     user_id = db.Column(db.Integer, db.ForeignKey('users.user_id'), nullable=False)
     relationship_type = db.Column(db.String(50))  # Father, Mother, Guardian, etc.
-    contact_preferences = db.Column(db.Text)  # JSON string
+    contact_preferences = deferred(db.Column(JSONDocument), group='blob')
     primary_contact = db.Column(db.Boolean, default=False)
     occupation = db.Column(db.String(100))
     notes = db.Column(db.Text)
-    
-    def get_contact_preferences(self):
-        return json.loads(self.contact_preferences) if self.contact_preferences else {}
-    
-    def set_contact_preferences(self, prefs):
-        self.contact_preferences = json.dumps(prefs)
-    
-    def to_dict(self):
-        return {
-            'parent_id': self.parent_id,
-            'user_id': self.user_id,
-            'relationship_type': self.relationship_type,
-            'contact_preferences': self.get_contact_preferences(),
-            'primary_contact': self.primary_contact,
-            'occupation': self.occupation,
-            'notes': self.notes
-        }
 
+    # One profile row per user; the unique index also makes the
+    # User -> Parent join an index seek
+    __table_args__ = (
+        db.Index('ix_parent_user_id', 'user_id', unique=True),
+    )
+
+    # Relationships
+    user = db.relationship('User', back_populates='parent_profile', lazy='select')
+
+    _to_dict_fields = (
+        ('parent_id', 'plain'),
+        ('user_id', 'plain'),
+        ('relationship_type', 'plain'),
+        ('contact_preferences', 'json_dict'),
+        ('primary_contact', 'plain'),
+        ('occupation', 'plain'),
+        ('notes', 'plain'),
+    )
+
+@_compiled_to_dict
 class Staff(db.Model):
     __tablename__ = 'staff'
     
@@ -176,25 +483,34 @@ class Staff(db.Model):
     department = db.Column(db.String(100))
     position = db.Column(db.String(100))
     hire_date = db.Column(db.Date)
-    salary = db.Column(Numeric(10, 2))
+    # asdecimal=False: salary is only stored and serialized, never
+    # computed on, so skip the per-row Decimal round-trip
+    salary = db.Column(Numeric(10, 2, asdecimal=False))
     employment_status = db.Column(db.String(50), default='Active')
-    
+
+    # One profile row per user; the unique index also makes the
+    # User -> Staff join an index seek
+    __table_args__ = (
+        db.Index('ix_staff_user_id', 'user_id', unique=True),
+    )
+
     # Relationships
-    staff_attendance = db.relationship('StaffAttendance', backref='staff', lazy=True)
-    
-    def to_dict(self):
-        return {
-            'staff_id': self.staff_id,
-            'user_id': self.user_id,
-            'employee_id': self.employee_id,
-            'department': self.department,
-            'position': self.position,
-            'hire_date': self.hire_date.isoformat() if self.hire_date else None,
-            'salary': float(self.salary) if self.salary else None,
-            'employment_status': self.employment_status
-        }
+    user = db.relationship('User', back_populates='staff_profile', lazy='select')
+    staff_attendance = db.relationship('StaffAttendance', back_populates='staff', lazy='select')
+
+    _to_dict_fields = (
+        ('staff_id', 'plain'),
+        ('user_id', 'plain'),
+        ('employee_id', 'plain'),
+        ('department', 'plain'),
+        ('position', 'plain'),
+        ('hire_date', 'date'),
+        ('salary', 'plain'),
+        ('employment_status', 'plain'),
+    )
 
 # Academic Structure Models
+@_compiled_to_dict
 class School(db.Model):
     __tablename__ = 'schools'
     
@@ -203,38 +519,32 @@ class School(db.Model):
     address = db.Column(db.Text)
     phone = db.Column(db.String(20))
     email = db.Column(db.String(120))
-    configuration = db.Column(db.Text)  # JSON string
+    configuration = deferred(db.Column(JSONDocument), group='blob')
     is_active = db.Column(db.Boolean, default=True)
     created_at = db.Column(db.DateTime, default=datetime.utcnow)
     
     # Relationships
-    academic_years = db.relationship('AcademicYear', backref='school', lazy=True)
-    classes = db.relationship('Class', backref='school', lazy=True)
-    subjects = db.relationship('Subject', backref='school', lazy=True)
-    fee_structures = db.relationship('FeeStructure', backref='school', lazy=True)
-    financial_accounts = db.relationship('FinancialAccount', backref='school', lazy=True)
-    announcements = db.relationship('Announcement', backref='school', lazy=True)
-    library_books = db.relationship('LibraryBook', backref='school', lazy=True)
-    inventory_items = db.relationship('InventoryItem', backref='school', lazy=True)
-    
-    def get_configuration(self):
-        return json.loads(self.configuration) if self.configuration else {}
-    
-    def set_configuration(self, config):
-        self.configuration = json.dumps(config)
-    
-    def to_dict(self):
-        return {
-            'school_id': self.school_id,
-            'name': self.name,
-            'address': self.address,
-            'phone': self.phone,
-            'email': self.email,
-            'configuration': self.get_configuration(),
-            'is_active': self.is_active,
-            'created_at': self.created_at.isoformat() if self.created_at else None
-        }
+    academic_years = db.relationship('AcademicYear', back_populates='school', lazy='select')
+    classes = db.relationship('Class', back_populates='school', lazy='select')
+    subjects = db.relationship('Subject', back_populates='school', lazy='select')
+    fee_structures = db.relationship('FeeStructure', backref='school', lazy='select')
+    financial_accounts = db.relationship('FinancialAccount', backref='school', lazy='select')
+    announcements = db.relationship('Announcement', backref='school', lazy='select')
+    library_books = db.relationship('LibraryBook', backref='school', lazy='select')
+    inventory_items = db.relationship('InventoryItem', backref='school', lazy='select')
+    
+    _to_dict_fields = (
+        ('school_id', 'plain'),
+        ('name', 'plain'),
+        ('address', 'plain'),
+        ('phone', 'plain'),
+        ('email', 'plain'),
+        ('configuration', 'json_dict'),
+        ('is_active', 'plain'),
+        ('created_at', 'datetime'),
+    )
 
+@_compiled_to_dict
 class AcademicYear(db.Model):
     __tablename__ = 'academic_years'
     
@@ -243,39 +553,33 @@ class AcademicYear(db.Model):
     year_name = db.Column(db.String(50), nullable=False)
     start_date = db.Column(db.Date, nullable=False)
     end_date = db.Column(db.Date, nullable=False)
-    term_structure = db.Column(db.Text)  # JSON string
+    term_structure = deferred(db.Column(JSONDocument), group='blob')
     is_current = db.Column(db.Boolean, default=False)
-    holiday_calendar = db.Column(db.Text)  # JSON string
-    
+    holiday_calendar = deferred(db.Column(JSONDocument), group='blob')
+
+    # Matches the "current year for this school" lookup
+    __table_args__ = (
+        db.Index('ix_acadyear_school_current', 'school_id', 'is_current'),
+    )
+
     # Relationships
-    enrollments = db.relationship('Enrollment', backref='academic_year', lazy=True)
-    report_cards = db.relationship('ReportCard', backref='academic_year', lazy=True)
-    fee_structures = db.relationship('FeeStructure', backref='academic_year', lazy=True)
-    
-    def get_term_structure(self):
-        return json.loads(self.term_structure) if self.term_structure else []
-    
-    def set_term_structure(self, terms):
-        self.term_structure = json.dumps(terms)
-    
-    def get_holiday_calendar(self):
-        return json.loads(self.holiday_calendar) if self.holiday_calendar else []
-    
-    def set_holiday_calendar(self, holidays):
-        self.holiday_calendar = json.dumps(holidays)
-    
-    def to_dict(self):
-        return {
-            'year_id': self.year_id,
-            'school_id': self.school_id,
-            'year_name': self.year_name,
-            'start_date': self.start_date.isoformat() if self.start_date else None,
-            'end_date': self.end_date.isoformat() if self.end_date else None,
-            'term_structure': self.get_term_structure(),
-            'is_current': self.is_current,
-            'holiday_calendar': self.get_holiday_calendar()
-        }
+    school = db.relationship('School', back_populates='academic_years', lazy='select')
+    enrollments = db.relationship('Enrollment', back_populates='academic_year', lazy='select')
+    report_cards = db.relationship('ReportCard', back_populates='academic_year', lazy='select')
+    fee_structures = db.relationship('FeeStructure', backref='academic_year', lazy='select')
+    
+    _to_dict_fields = (
+        ('year_id', 'plain'),
+        ('school_id', 'plain'),
+        ('year_name', 'plain'),
+        ('start_date', 'date'),
+        ('end_date', 'date'),
+        ('term_structure', 'json_list'),
+        ('is_current', 'plain'),
+        ('holiday_calendar', 'json_list'),
+    )
 
+@_compiled_to_dict
 class Class(db.Model):
     __tablename__ = 'classes'
     
@@ -287,34 +591,35 @@ class Class(db.Model):
     capacity = db.Column(db.Integer)
     teacher_id = db.Column(db.Integer, db.ForeignKey('teachers.teacher_id'))
     classroom = db.Column(db.String(50))
-    schedule = db.Column(db.Text)  # JSON string
+    schedule = deferred(db.Column(JSONDocument), group='blob')
     is_active = db.Column(db.Boolean, default=True)
-    
+
+    # Matches the class listing filters (school, year, active)
+    __table_args__ = (
+        db.Index('ix_class_school_year_active', 'school_id', 'year_id', 'is_active'),
+    )
+
     # Relationships
-    enrollments = db.relationship('Enrollment', backref='enrolled_class', lazy=True)
-    assignments = db.relationship('Assignment', backref='assigned_class', lazy=True)
-    attendance_records = db.relationship('AttendanceRecord', backref='attendance_class', lazy=True)
-    
-    def get_schedule(self):
-        return json.loads(self.schedule) if self.schedule else {}
-    
-    def set_schedule(self, sched):
-        self.schedule = json.dumps(sched)
-    
-    def to_dict(self):
-        return {
-            'class_id': self.class_id,
-            'school_id': self.school_id,
-            'year_id': self.year_id,
-            'class_name': self.class_name,
-            'grade_level': self.grade_level,
-            'capacity': self.capacity,
-            'teacher_id': self.teacher_id,
-            'classroom': self.classroom,
-            'schedule': self.get_schedule(),
-            'is_active': self.is_active
-        }
+    school = db.relationship('School', back_populates='classes', lazy='select')
+    teacher = db.relationship('Teacher', back_populates='classes', lazy='select')
+    enrollments = db.relationship('Enrollment', back_populates='enrolled_class', lazy='select')
+    assignments = db.relationship('Assignment', back_populates='assigned_class', lazy='select')
+    attendance_records = db.relationship('AttendanceRecord', back_populates='attendance_class', lazy='select')
+    
+    _to_dict_fields = (
+        ('class_id', 'plain'),
+        ('school_id', 'plain'),
+        ('year_id', 'plain'),
+        ('class_name', 'plain'),
+        ('grade_level', 'plain'),
+        ('capacity', 'plain'),
+        ('teacher_id', 'plain'),
+        ('classroom', 'plain'),
+        ('schedule', 'json_dict'),
+        ('is_active', 'plain'),
+    )
 
+@_compiled_to_dict
 class Subject(db.Model):
     __tablename__ = 'subjects'
     
@@ -324,38 +629,27 @@ class Subject(db.Model):
     subject_code = db.Column(db.String(20))
     description = db.Column(db.Text)
     credit_hours = db.Column(db.Integer)
-    prerequisites = db.Column(db.Text)  # JSON string
-    learning_objectives = db.Column(db.Text)  # JSON string
+    prerequisites = deferred(db.Column(JSONDocument), group='blob')
+    learning_objectives = deferred(db.Column(JSONDocument), group='blob')
     is_active = db.Column(db.Boolean, default=True)
     
     # Relationships
-    assignments = db.relationship('Assignment', backref='subject', lazy=True)
-    
-    def get_prerequisites(self):
-        return json.loads(self.prerequisites) if self.prerequisites else []
-    
-    def set_prerequisites(self, prereqs):
-        self.prerequisites = json.dumps(prereqs)
-    
-    def get_learning_objectives(self):
-        return json.loads(self.learning_objectives) if self.learning_objectives else []
-    
-    def set_learning_objectives(self, objectives):
-        self.learning_objectives = json.dumps(objectives)
-    
-    def to_dict(self):
-        return {
-            'subject_id': self.subject_id,
-            'school_id': self.school_id,
-            'subject_name': self.subject_name,
-            'subject_code': self.subject_code,
-            'description': self.description,
-            'credit_hours': self.credit_hours,
-            'prerequisites': self.get_prerequisites(),
-            'learning_objectives': self.get_learning_objectives(),
-            'is_active': self.is_active
-        }
+    school = db.relationship('School', back_populates='subjects', lazy='select')
+    assignments = db.relationship('Assignment', back_populates='subject', lazy='select')
+    
+    _to_dict_fields = (
+        ('subject_id', 'plain'),
+        ('school_id', 'plain'),
+        ('subject_name', 'plain'),
+        ('subject_code', 'plain'),
+        ('description', 'plain'),
+        ('credit_hours', 'plain'),
+        ('prerequisites', 'json_list'),
+        ('learning_objectives', 'json_list'),
+        ('is_active', 'plain'),
+    )
 
+@_compiled_to_dict
 class Enrollment(db.Model):
     __tablename__ = 'enrollments'
     
@@ -366,23 +660,27 @@ class Enrollment(db.Model):
     enrollment_date = db.Column(db.Date, default=date.today)
     status = db.Column(db.String(50), default='Active')
     completion_date = db.Column(db.Date)
-    performance_summary = db.Column(db.Text)  # JSON string
-    
-    def get_performance_summary(self):
-        return json.loads(self.performance_summary) if self.performance_summary else {}
-    
-    def set_performance_summary(self, summary):
-        self.performance_summary = json.dumps(summary)
-    
-    def to_dict(self):
-        return {
-            'enrollment_id': self.enrollment_id,
-            'student_id': self.student_id,
-            'class_id': self.class_id,
-            'year_id': self.year_id,
-            'enrollment_date': self.enrollment_date.isoformat() if self.enrollment_date else None,
-            'status': self.status,
-            'completion_date': self.completion_date.isoformat() if self.completion_date else None,
-            'performance_summary': self.get_performance_summary()
-        }
+    performance_summary = deferred(db.Column(JSONDocument), group='blob')
+
+    # Matches the "active enrollment for student X in year Y" lookups
+    __table_args__ = (
+        db.Index('ix_enrollment_student_year_status', 'student_id', 'year_id', 'status'),
+    )
+
+    # Relationships; the student and class rows are serialized with
+    # nearly every enrollment, so they are batch-loaded
+    student = db.relationship('Student', back_populates='enrollments', lazy='selectin')
+    enrolled_class = db.relationship('Class', back_populates='enrollments', lazy='selectin')
+    academic_year = db.relationship('AcademicYear', back_populates='enrollments', lazy='select')
+
+    _to_dict_fields = (
+        ('enrollment_id', 'plain'),
+        ('student_id', 'plain'),
+        ('class_id', 'plain'),
+        ('year_id', 'plain'),
+        ('enrollment_date', 'date'),
+        ('status', 'plain'),
+        ('completion_date', 'date'),
+        ('performance_summary', 'json_dict'),
+    )
 